@@ -5,18 +5,33 @@ Autonomous Programming Assignment Evaluation System
 
 from flask import Flask, jsonify, request, send_file
 from flask_cors import CORS
-import threading
+from pymongo import UpdateOne
+from bson.objectid import ObjectId
+from apscheduler.schedulers.background import BackgroundScheduler
+import io
 import os
+import time
+import logging
+import threading
+from functools import wraps
 from datetime import datetime
+from dateutil import parser as date_parser
 
 from config import Config
-from utils.db_connection import db
-from services.drive_monitor import DriveMonitor
+from utils.db_connection import db, get_db
+from utils.json_provider import ORJSONProvider
+from models.assessment import Assessment
+from services.drive_monitor import DriveMonitor, MONITOR_STATE_ID, LEADER_LEASE_TTL
 from services.evaluator import AssignmentEvaluator
 from services.report_generator import ReportGenerator
 
-# Initialize Flask app
-app = Flask(__name__)
+# Service modules log through logging; keep their output looking like the rest of the console output
+logging.basicConfig(level=Config.LOG_LEVEL, format='%(message)s')
+
+# Initialize Flask app (the dashboard is served by Flask's static file handler)
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'frontend')
+app = Flask(__name__, static_folder=FRONTEND_DIR, static_url_path='')
+app.json = ORJSONProvider(app)
 app.config.from_object(Config)
 CORS(app)
 
@@ -25,13 +40,62 @@ drive_monitor = DriveMonitor()
 evaluator = AssignmentEvaluator()
 report_generator = ReportGenerator()
 
-# Global monitoring state
-monitoring_thread = None
-monitoring_active = False
+# Background scheduler that runs the Drive poll job while monitoring is active
+MONITOR_JOB_ID = 'drive_monitor'
+SUPERVISOR_JOB_ID = 'drive_monitor_supervisor'
+scheduler = BackgroundScheduler(daemon=True)
+scheduler.start()
+supervisor_lock = threading.Lock()
+
+# Cached statistics responses: view name -> (etag, body)
+stats_cache = {}
 
 # Validate configuration on startup
 Config.validate()
 
+# Connect now so startup reports MongoDB status; forked processes reconnect on first use
+get_db()
+
+def supervise_monitor():
+    """Run the Drive poll job in this process only while it holds the monitor lease
+    
+    Every worker runs this on a timer, so whichever one holds the lease follows the
+    shared monitoring_active flag and another takes over if that worker exits.
+    """
+    with supervisor_lock:
+        leading = drive_monitor.acquire_leadership()
+        polling = scheduler.get_job(MONITOR_JOB_ID) is not None
+        
+        if leading and not polling:
+            if not drive_monitor.start_monitoring():
+                drive_monitor.release_leadership()
+                return
+            
+            # Poll immediately, then every MONITORING_INTERVAL seconds; never overlap polls
+            scheduler.add_job(
+                drive_monitor.poll_once,
+                'interval',
+                seconds=Config.MONITORING_INTERVAL,
+                id=MONITOR_JOB_ID,
+                max_instances=1,
+                coalesce=True,
+                next_run_time=datetime.now()
+            )
+        elif polling and not leading:
+            scheduler.remove_job(MONITOR_JOB_ID)
+            drive_monitor.stop_monitoring()
+            drive_monitor.release_leadership()
+
+scheduler.add_job(
+    supervise_monitor,
+    'interval',
+    seconds=LEADER_LEASE_TTL // 3,
+    id=SUPERVISOR_JOB_ID,
+    max_instances=1,
+    coalesce=True,
+    next_run_time=datetime.now()
+)
+
 # ============================================================================
 # ROOT ENDPOINT & FRONTEND
 # ============================================================================
@@ -39,30 +103,20 @@ Config.validate()
 @app.route('/')
 def index():
     """Serve frontend when available otherwise report backend status"""
-    frontend_path = os.path.join(
-        os.path.dirname(os.path.dirname(__file__)),
-        'frontend',
-        'index.html'
-    )
-    if os.path.exists(frontend_path):
-        return send_file(frontend_path)
+    if os.path.exists(os.path.join(FRONTEND_DIR, 'index.html')):
+        return app.send_static_file('index.html')
     return jsonify({
         'message': 'Backend running',
         'frontend': 'not bundled on this host',
         'status': 'ok'
     })
 
-@app.route('/css/<path:filename>')
-def serve_css(filename):
-    """Serve CSS files"""
-    css_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'frontend', 'css', filename)
-    return send_file(css_path)
-
-@app.route('/js/<path:filename>')
-def serve_js(filename):
-    """Serve JavaScript files"""
-    js_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'frontend', 'js', filename)
-    return send_file(js_path)
+@app.after_request
+def cache_static_assets(response):
+    """Let browsers cache CSS/JS; the static handler already supplies ETags"""
+    if request.path.startswith(('/css/', '/js/')) and response.status_code in (200, 304):
+        response.headers['Cache-Control'] = 'public, max-age=86400'
+    return response
 
 @app.route('/api')
 def api_info():
@@ -83,14 +137,40 @@ def api_info():
 # SUBMISSIONS ENDPOINTS
 # ============================================================================
 
+def parse_submissions_cursor(cursor):
+    """(submitted_at, _id) from a next_cursor string, or None if it is malformed"""
+    timestamp, _, submission_id = cursor.rpartition(',')
+    if not ObjectId.is_valid(submission_id):
+        return None
+    try:
+        return date_parser.isoparse(timestamp), ObjectId(submission_id)
+    except ValueError:
+        return None
+
 @app.route('/api/submissions', methods=['GET'])
 def get_submissions():
-    """Get all submissions with optional filtering"""
+    """Get all submissions with optional filtering
+    
+    Query params:
+        status, student_id: optional filters
+        before: cursor returned as next_cursor by the previous page
+        limit: page size (default: 100)
+    """
     try:
         # Get query parameters
         status = request.args.get('status')
         student_id = request.args.get('student_id')
-        limit = int(request.args.get('limit', 100))
+        before = request.args.get('before')
+        
+        try:
+            limit = int(request.args.get('limit', 100))
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return jsonify({
+                'success': False,
+                'error': 'limit must be a positive integer'
+            }), 400
         
         # Build query
         query = {}
@@ -98,21 +178,40 @@ def get_submissions():
             query['status'] = status
         if student_id:
             query['student_id'] = student_id
+        if before:
+            cursor = parse_submissions_cursor(before)
+            if cursor is None:
+                return jsonify({
+                    'success': False,
+                    'error': 'Invalid before cursor'
+                }), 400
+            # Keyset pagination: continue strictly after the previous page's last (submitted_at, _id)
+            submitted_at, submission_id = cursor
+            query['$or'] = [
+                {'submitted_at': {'$lt': submitted_at}},
+                {'submitted_at': submitted_at, '_id': {'$lt': submission_id}}
+            ]
+        
+        # Fetch from database (file_content is never needed by the list view);
+        # _id breaks ties between submissions with the same submitted_at
+        submissions = list(
+            db.submissions.find(query, projection={'file_content': 0})
+            .sort([('submitted_at', -1), ('_id', -1)])
+            .limit(limit)
+            .batch_size(limit)
+        )
         
-        # Fetch from database
-        submissions = list(db.submissions.find(query).sort('submitted_at', -1).limit(limit))
-        
-        # Convert ObjectId to string and remove bytes fields
-        for sub in submissions:
-            sub['_id'] = str(sub['_id'])
-            # Remove file_content if it's bytes
-            if 'file_content' in sub and isinstance(sub['file_content'], bytes):
-                sub['file_content'] = sub['file_content'].decode('utf-8', errors='ignore')[:500]
+        # Cursor for the next page (pass back as ?before=...)
+        next_cursor = None
+        if submissions and len(submissions) == limit and isinstance(submissions[-1].get('submitted_at'), datetime):
+            last = submissions[-1]
+            next_cursor = f"{last['submitted_at'].isoformat()},{last['_id']}"
         
         return jsonify({
             'success': True,
             'count': len(submissions),
-            'submissions': submissions
+            'submissions': submissions,
+            'next_cursor': next_cursor
         })
     
     except Exception as e:
@@ -125,9 +224,18 @@ def get_submissions():
 def get_submission(submission_id):
     """Get specific submission by ID"""
     try:
-        from bson.objectid import ObjectId
+        if not ObjectId.is_valid(submission_id):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid submission ID'
+            }), 400
         
-        submission = db.submissions.find_one({'_id': ObjectId(submission_id)})
+        # Only the first 500 characters of file_content leave the database
+        pipeline = [
+            {'$match': {'_id': ObjectId(submission_id)}},
+            {'$set': {'file_content': {'$substrCP': [{'$ifNull': ['$file_content', '']}, 0, 500]}}}
+        ]
+        submission = next(db.submissions.aggregate(pipeline, batchSize=1), None)
         
         if not submission:
             return jsonify({
@@ -135,12 +243,6 @@ def get_submission(submission_id):
                 'error': 'Submission not found'
             }), 404
         
-        submission['_id'] = str(submission['_id'])
-        
-        # Remove or convert bytes fields
-        if 'file_content' in submission and isinstance(submission['file_content'], bytes):
-            submission['file_content'] = submission['file_content'].decode('utf-8', errors='ignore')[:500]
-        
         return jsonify({
             'success': True,
             'submission': submission
@@ -156,7 +258,11 @@ def get_submission(submission_id):
 def evaluate_submission(submission_id):
     """Manually trigger evaluation for a submission"""
     try:
-        from bson.objectid import ObjectId
+        if not ObjectId.is_valid(submission_id):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid submission ID'
+            }), 400
         
         submission = db.submissions.find_one({'_id': ObjectId(submission_id)})
         
@@ -180,6 +286,7 @@ def evaluate_submission(submission_id):
                 }
             }
         )
+        db.mark_submissions_changed()
         
         return jsonify({
             'success': True,
@@ -193,6 +300,83 @@ def evaluate_submission(submission_id):
             'error': str(e)
         }), 500
 
+@app.route('/api/submissions/evaluate_batch', methods=['POST'])
+def evaluate_submissions_batch():
+    """Evaluate many submissions in one request
+    
+    JSON body:
+        ids: list of submission IDs to evaluate, or
+        status: evaluate every submission with this status (e.g. 'pending')
+    """
+    try:
+        body = request.get_json(silent=True) or {}
+        ids = body.get('ids')
+        status = body.get('status')
+        
+        if ids:
+            if not all(ObjectId.is_valid(i) for i in ids):
+                return jsonify({
+                    'success': False,
+                    'error': 'Invalid submission ID in ids'
+                }), 400
+            query = {'_id': {'$in': [ObjectId(i) for i in ids]}}
+        elif status:
+            query = {'status': status}
+        else:
+            return jsonify({
+                'success': False,
+                'error': 'Provide either ids or status'
+            }), 400
+        
+        # One read for every target submission
+        submissions = list(db.submissions.find(query))
+        
+        if not submissions:
+            return jsonify({
+                'success': False,
+                'error': 'No matching submissions found'
+            }), 404
+        
+        # Evaluate across CPU cores; results come back in submission order
+        assessments = evaluator.evaluate_batch(submissions)
+        
+        evaluated_at = datetime.utcnow()
+        operations = []
+        results = []
+        for submission, assessment in zip(submissions, assessments):
+            operations.append(UpdateOne(
+                {'_id': submission['_id']},
+                {
+                    '$set': {
+                        'assessment': assessment,
+                        'status': 'evaluated',
+                        'evaluated_at': evaluated_at
+                    }
+                }
+            ))
+            results.append({
+                '_id': str(submission['_id']),
+                'total_score': assessment['total_score'],
+                'grade': assessment['grade']
+            })
+        
+        # One write for every update
+        db.submissions.bulk_write(operations, ordered=False)
+        db.mark_submissions_changed()
+        
+        return jsonify({
+            'success': True,
+            'message': 'Batch evaluation completed',
+            'count': len(results),
+            'results': results
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 # ============================================================================
 # MONITORING ENDPOINTS
 # ============================================================================
@@ -200,19 +384,21 @@ def evaluate_submission(submission_id):
 @app.route('/api/monitor/start', methods=['POST'])
 def start_monitoring():
     """Start Google Drive monitoring"""
-    global monitoring_thread, monitoring_active
-    
     try:
-        if monitoring_active:
+        if not drive_monitor.is_configured():
+            return jsonify({
+                'success': False,
+                'error': 'Google Drive monitoring could not be started. Check the Drive credentials and folder ID.'
+            }), 500
+        
+        if not drive_monitor.set_monitoring_active(True):
             return jsonify({
                 'success': False,
                 'message': 'Monitoring is already active'
             })
         
-        monitoring_active = True
-        monitoring_thread = threading.Thread(target=drive_monitor.start_monitoring)
-        monitoring_thread.daemon = True
-        monitoring_thread.start()
+        # Whichever worker takes the lease starts polling; usually this one, right away
+        supervise_monitor()
         
         return jsonify({
             'success': True,
@@ -220,7 +406,6 @@ def start_monitoring():
         })
     
     except Exception as e:
-        monitoring_active = False
         return jsonify({
             'success': False,
             'error': str(e)
@@ -229,17 +414,15 @@ def start_monitoring():
 @app.route('/api/monitor/stop', methods=['POST'])
 def stop_monitoring():
     """Stop Google Drive monitoring"""
-    global monitoring_active
-    
     try:
-        if not monitoring_active:
+        if not drive_monitor.set_monitoring_active(False):
             return jsonify({
                 'success': False,
                 'message': 'Monitoring is not active'
             })
         
-        monitoring_active = False
-        drive_monitor.stop_monitoring()
+        # The lease holder stops on its next supervisor tick, or now if it is this worker
+        supervise_monitor()
         
         return jsonify({
             'success': True,
@@ -255,13 +438,52 @@ def stop_monitoring():
 @app.route('/api/monitor/status', methods=['GET'])
 def get_monitor_status():
     """Get monitoring status"""
+    state = db.monitor_state.find_one({'_id': MONITOR_STATE_ID}) or {}
     return jsonify({
         'success': True,
-        'monitoring_active': monitoring_active,
-        'last_check': drive_monitor.last_check_time,
-        'files_processed': drive_monitor.files_processed
+        'monitoring_active': state.get('monitoring_active', False),
+        'last_check': state.get('last_check_time'),
+        'files_processed': state.get('files_processed', 0)
     })
 
+@app.route('/api/drive/webhook', methods=['POST'])
+def drive_webhook():
+    """Receive a Google Drive push notification and poll for the change right away"""
+    try:
+        if not drive_monitor.is_valid_notification(
+            request.headers.get('X-Goog-Channel-ID'),
+            request.headers.get('X-Goog-Channel-Token')
+        ):
+            return jsonify({
+                'success': False,
+                'error': 'Unknown notification channel'
+            }), 403
+        
+        # 'sync' only confirms the channel was created
+        if request.headers.get('X-Goog-Resource-State') == 'sync':
+            return jsonify({'success': True})
+        
+        # Refuse while monitoring is off so Google redelivers the notification later
+        state = db.monitor_state.find_one({'_id': MONITOR_STATE_ID}, {'monitoring_active': 1}) or {}
+        if not state.get('monitoring_active'):
+            return jsonify({
+                'success': False,
+                'error': 'Monitoring is not active'
+            }), 503
+        
+        # The lease holder picks the request up on its next tick; poll now if that is this worker
+        drive_monitor.request_poll()
+        if scheduler.get_job(MONITOR_JOB_ID):
+            scheduler.modify_job(MONITOR_JOB_ID, next_run_time=datetime.now())
+        
+        return jsonify({'success': True})
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 # ============================================================================
 # REPORTS ENDPOINTS
 # ============================================================================
@@ -274,7 +496,11 @@ def generate_individual_report(submission_id):
         format: 'pdf' or 'txt' (default: 'pdf')
     """
     try:
-        from bson.objectid import ObjectId
+        if not ObjectId.is_valid(submission_id):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid submission ID'
+            }), 400
         
         submission = db.submissions.find_one({'_id': ObjectId(submission_id)})
         
@@ -293,14 +519,120 @@ def generate_individual_report(submission_id):
         # Get format from query parameter (default: pdf)
         report_format = request.args.get('format', 'pdf')
         
-        # Generate report
+        # The evaluation timestamp versions the report; unchanged means the client copy is current
+        etag = f"{submission_id}-{report_generator.report_version(submission)}-{report_format.lower()}"
+        if request.if_none_match.contains_weak(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag, weak=True)
+            return response
+        
+        # Generate report (reuses the existing file if this evaluation was already rendered)
         report_path = report_generator.generate_individual_report(submission, format=report_format)
         
-        return jsonify({
+        response = jsonify({
             'success': True,
             'message': 'Report generated successfully',
             'download_url': f'/api/reports/download/{os.path.basename(report_path)}'
         })
+        response.set_etag(etag, weak=True)
+        return response
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/reports/individual/<submission_id>/pdf', methods=['GET'])
+def stream_individual_report(submission_id):
+    """Render an individual PDF report straight into the response, without a file on disk"""
+    try:
+        if not ObjectId.is_valid(submission_id):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid submission ID'
+            }), 400
+        
+        submission = db.submissions.find_one({'_id': ObjectId(submission_id)}, {'file_content': 0})
+        
+        if not submission:
+            return jsonify({
+                'success': False,
+                'error': 'Submission not found'
+            }), 404
+        
+        if submission.get('status') != 'evaluated':
+            return jsonify({
+                'success': False,
+                'error': 'Submission not yet evaluated'
+            }), 400
+        
+        etag = f"{submission_id}-{report_generator.report_version(submission)}-pdf"
+        if request.if_none_match.contains_weak(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag, weak=True)
+            return response
+        
+        response = send_file(
+            io.BytesIO(report_generator.generate_pdf_report_bytes(submission)),
+            mimetype='application/pdf',
+            as_attachment=True,
+            download_name=report_generator.report_filename(submission, 'pdf')
+        )
+        response.set_etag(etag, weak=True)
+        return response
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/reports/bulk', methods=['POST'])
+def generate_bulk_reports():
+    """Generate individual reports for many evaluated submissions
+    
+    JSON body:
+        ids: list of submission IDs (default: every evaluated submission)
+        format: 'pdf' or 'txt' (default: 'pdf')
+    """
+    try:
+        body = request.get_json(silent=True) or {}
+        ids = body.get('ids')
+        report_format = body.get('format', 'pdf')
+        
+        query = {'status': 'evaluated'}
+        if ids:
+            if not all(ObjectId.is_valid(i) for i in ids):
+                return jsonify({
+                    'success': False,
+                    'error': 'Invalid submission ID in ids'
+                }), 400
+            query['_id'] = {'$in': [ObjectId(i) for i in ids]}
+        
+        submissions = list(db.submissions.find(query, {'file_content': 0}))
+        
+        if not submissions:
+            return jsonify({
+                'success': False,
+                'error': 'No evaluated submissions found'
+            }), 404
+        
+        # Rendered across CPU cores; paths come back in submission order
+        report_paths = report_generator.generate_reports_bulk(submissions, format=report_format)
+        
+        return jsonify({
+            'success': True,
+            'message': 'Reports generated successfully',
+            'count': len(report_paths),
+            'reports': [
+                {
+                    '_id': str(submission['_id']),
+                    'download_url': f'/api/reports/download/{os.path.basename(path)}'
+                }
+                for submission, path in zip(submissions, report_paths)
+            ]
+        })
     
     except Exception as e:
         return jsonify({
@@ -312,9 +644,14 @@ def generate_individual_report(submission_id):
 def download_submission_file(submission_id):
     """Download the original assignment file from Google Drive"""
     try:
-        from bson.objectid import ObjectId
         import tempfile
         
+        if not ObjectId.is_valid(submission_id):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid submission ID'
+            }), 400
+        
         # Get submission from database
         submission = db.submissions.find_one({'_id': ObjectId(submission_id)})
         
@@ -372,17 +709,23 @@ def download_submission_file(submission_id):
 def generate_spreadsheet():
     """Generate Excel spreadsheet with all assessments"""
     try:
-        # Get all evaluated submissions
-        submissions = list(db.submissions.find({'status': 'evaluated'}))
-        
-        if not submissions:
+        if not db.submissions.count_documents({'status': 'evaluated'}, limit=1):
             return jsonify({
                 'success': False,
                 'error': 'No evaluated submissions found'
             }), 404
         
+        # Stream evaluated submissions straight into the workbook, with the
+        # letter grade derived from the score by the database
+        pipeline = [
+            {'$match': {'status': 'evaluated'}},
+            {'$project': {'file_content': 0}},
+            {'$set': {'assessment.grade': Assessment.grade_expression('$assessment.total_score')}}
+        ]
+        cursor = db.submissions.aggregate(pipeline, batchSize=500)
+        
         # Generate spreadsheet
-        spreadsheet_path = report_generator.generate_spreadsheet(submissions)
+        spreadsheet_path = report_generator.generate_spreadsheet(cursor)
         
         return jsonify({
             'success': True,
@@ -408,7 +751,17 @@ def download_report(filename):
                 'error': 'Report not found'
             }), 404
         
-        return send_file(file_path, as_attachment=True)
+        # Conditional GET lets repeat downloads of an unchanged report return 304;
+        # the file itself is streamed through wsgi.file_wrapper rather than buffered
+        response = send_file(
+            file_path,
+            as_attachment=True,
+            conditional=True,
+            etag=True,
+            last_modified=os.path.getmtime(file_path)
+        )
+        response.headers['Cache-Control'] = 'private, max-age=300'
+        return response
     
     except Exception as e:
         return jsonify({
@@ -420,33 +773,85 @@ def download_report(filename):
 # STATISTICS ENDPOINTS
 # ============================================================================
 
+def cached_stats(view):
+    """Cache a statistics response until submissions change and serve it with an ETag
+    
+    The ETag comes from the shared submissions version, so every worker agrees on it and
+    any recorded write makes it stale at once. It also rolls over every STATS_CACHE_TTL
+    seconds to pick up writes made outside the API (e.g. maintenance scripts).
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        bucket = int(time.time() // Config.STATS_CACHE_TTL)
+        etag = f"{view.__name__}-{db.submissions_version()}-{bucket}"
+        
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+        else:
+            cached = stats_cache.get(view.__name__)
+            if not cached or cached[0] != etag:
+                result = view(*args, **kwargs)
+                # Only successful responses are cached; errors pass straight through
+                if isinstance(result, tuple) or result.status_code != 200:
+                    return result
+                cached = (etag, result.get_data())
+                stats_cache[view.__name__] = cached
+            response = app.response_class(cached[1], mimetype='application/json')
+        
+        response.set_etag(etag)
+        # Clients revalidate every time; an unchanged version answers with a bodiless 304
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return wrapper
+
 @app.route('/api/stats/overview', methods=['GET'])
+@cached_stats
 def get_statistics_overview():
     """Get overall statistics"""
     try:
-        total_submissions = db.submissions.count_documents({})
-        evaluated = db.submissions.count_documents({'status': 'evaluated'})
-        pending = db.submissions.count_documents({'status': 'pending'})
-        
-        # Calculate average score
+        # Compute the predicate-filtered figures in a single aggregation round-trip
         pipeline = [
-            {'$match': {'status': 'evaluated'}},
-            {'$group': {
-                '_id': None,
-                'avg_score': {'$avg': '$assessment.total_score'}
+            {'$facet': {
+                'by_status': [{'$group': {'_id': '$status', 'n': {'$sum': 1}}}],
+                'avg': [
+                    {'$match': {'status': 'evaluated'}},
+                    {'$group': {'_id': None, 'avg_score': {'$avg': '$assessment.total_score'}}}
+                ],
+                'passed': [
+                    {'$match': {
+                        'status': 'evaluated',
+                        'assessment.total_score': {'$gte': Config.PASS_THRESHOLD}
+                    }},
+                    {'$count': 'n'}
+                ],
+                'grades': [
+                    {'$match': {'status': 'evaluated'}},
+                    Assessment.grade_bucket_stage('$assessment.total_score')
+                ]
             }}
         ]
-        avg_result = list(db.submissions.aggregate(pipeline))
+        facets = next(db.submissions.aggregate(pipeline, batchSize=1))
+        
+        by_status = {row['_id']: row['n'] for row in facets['by_status']}
+        # Collection metadata count; approximate is fine for the total card
+        total_submissions = db.submissions.estimated_document_count()
+        evaluated = by_status.get('evaluated', 0)
+        pending = by_status.get('pending', 0)
+        
+        avg_result = facets['avg']
         avg_score = round(avg_result[0]['avg_score'], 2) if avg_result else 0
         
-        # Get pass/fail counts
-        passed = db.submissions.count_documents({
-            'status': 'evaluated',
-            'assessment.total_score': {'$gte': Config.PASS_THRESHOLD}
-        })
+        passed = facets['passed'][0]['n'] if facets['passed'] else 0
         
         failed = evaluated - passed
         
+        # Buckets are keyed by the lower bound of each grade band
+        band_grades = dict(Assessment.GRADE_SCALE)
+        grade_distribution = {grade: 0 for _, grade in Assessment.GRADE_SCALE}
+        grade_distribution['F'] = 0
+        for bucket in facets['grades']:
+            grade_distribution[band_grades.get(bucket['_id'], 'F')] += bucket['n']
+        
         return jsonify({
             'success': True,
             'statistics': {
@@ -456,7 +861,8 @@ def get_statistics_overview():
                 'average_score': avg_score,
                 'passed': passed,
                 'failed': failed,
-                'pass_rate': round((passed / evaluated * 100), 2) if evaluated > 0 else 0
+                'pass_rate': round((passed / evaluated * 100), 2) if evaluated > 0 else 0,
+                'grade_distribution': grade_distribution
             }
         })
     
@@ -467,6 +873,7 @@ def get_statistics_overview():
         }), 500
 
 @app.route('/api/stats/submissions', methods=['GET'])
+@cached_stats
 def get_submission_trends():
     """Get submission trends over time"""
     try:
@@ -486,7 +893,7 @@ def get_submission_trends():
             {'$limit': 30}  # Last 30 days
         ]
         
-        trends = list(db.submissions.aggregate(pipeline))
+        trends = list(db.submissions.aggregate(pipeline, batchSize=30))
         
         return jsonify({
             'success': True,
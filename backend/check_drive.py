@@ -1,15 +1,19 @@
 """Check files in Google Drive folder"""
+import logging
+from config import Config
 from services.drive_monitor import DriveMonitor
 
+logging.basicConfig(level=Config.LOG_LEVEL, format='%(message)s')
+
 dm = DriveMonitor()
 
-if dm.service:
+if dm.client:
     folder_id = '1XAIeUTkE5rNb08zoYTK8rb-GULDK85ed'
-    results = dm.service.files().list(
-        q=f"'{folder_id}' in parents and trashed=false",
+    results = dm.run(dm.client.list_files(
+        f"'{folder_id}' in parents and trashed=false",
         fields='files(id, name, createdTime, mimeType)',
-        orderBy='createdTime desc'
-    ).execute()
+        order_by='createdTime desc'
+    ))
     
     files = results.get('files', [])
     print(f"\n✓ Files found in Google Drive folder: {len(files)}\n")
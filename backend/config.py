@@ -2,6 +2,7 @@
 Configuration settings for AutoAssess system
 """
 import os
+import re
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -14,10 +15,19 @@ class Config:
     DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
     HOST = os.getenv('HOST', '0.0.0.0')
     PORT = int(os.getenv('PORT', 5000))
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
     
     # MongoDB Configuration
     MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
     MONGODB_DB_NAME = os.getenv('MONGODB_DB_NAME', 'autoassess')
+    MONGODB_MAX_POOL_SIZE = int(os.getenv('MONGODB_MAX_POOL_SIZE', 100))
+    MONGODB_MIN_POOL_SIZE = int(os.getenv('MONGODB_MIN_POOL_SIZE', 5))
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGODB_SERVER_SELECTION_TIMEOUT_MS', 3000))
+    MONGODB_SOCKET_TIMEOUT_MS = int(os.getenv('MONGODB_SOCKET_TIMEOUT_MS', 10000))
+    # Wire compression, in order of preference; the server picks the first one it supports
+    MONGODB_COMPRESSORS = os.getenv('MONGODB_COMPRESSORS', 'zstd,zlib')
+    # Processes that never write (e.g. extra API replicas) can skip the startup index check
+    AUTO_CREATE_INDEXES = os.getenv('AUTO_CREATE_INDEXES', 'True').lower() == 'true'
     
     # Google Drive Configuration
     GOOGLE_DRIVE_FOLDER_ID = os.getenv('GOOGLE_DRIVE_FOLDER_ID', '')
@@ -26,12 +36,31 @@ class Config:
     
     # File Monitoring Configuration
     MONITORING_INTERVAL = int(os.getenv('MONITORING_INTERVAL', 30))  # seconds
-    SUPPORTED_FILE_TYPES = ['.pdf', '.docx', '.txt', '.doc', '.png', '.jpg', '.jpeg']
+    SUPPORTED_FILE_TYPES = frozenset({'.pdf', '.docx', '.txt', '.doc', '.png', '.jpg', '.jpeg'})
+    SUPPORTED_MIME_TYPES = [
+        'application/pdf',
+        'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+        'application/msword',
+        'text/plain',
+        'image/png',
+        'image/jpeg'
+    ]
+    MAX_CONCURRENT_DOWNLOADS = int(os.getenv('MAX_CONCURRENT_DOWNLOADS', 5))
+    DRIVE_REQUESTS_PER_MINUTE = int(os.getenv('DRIVE_REQUESTS_PER_MINUTE', 50))
+    DRIVE_PAGE_SIZE = int(os.getenv('DRIVE_PAGE_SIZE', 1000))  # files per files.list page (max 1000)
+    
+    # Drive push notifications (optional): public HTTPS URL of /api/drive/webhook and a shared secret
+    DRIVE_WEBHOOK_URL = os.getenv('DRIVE_WEBHOOK_URL', '')
+    DRIVE_WEBHOOK_TOKEN = os.getenv('DRIVE_WEBHOOK_TOKEN', '')
+    WEBHOOK_SAFETY_POLL_INTERVAL = int(os.getenv('WEBHOOK_SAFETY_POLL_INTERVAL', 3600))  # seconds
     
     # Evaluation Configuration
     MAX_SCORE = 100
     PASS_THRESHOLD = 50
     
+    # Statistics Configuration
+    STATS_CACHE_TTL = int(os.getenv('STATS_CACHE_TTL', 30))  # seconds
+    
     # Report Configuration
     REPORTS_DIR = os.path.join(os.path.dirname(__file__), 'reports')
     TEMP_DIR = os.path.join(os.path.dirname(__file__), 'temp')
@@ -89,20 +118,20 @@ class Config:
         }
     }
     
-    # Student ID patterns (regex patterns) - case insensitive
-    STUDENT_ID_PATTERNS = [
+    # Student ID patterns (compiled regex, tried in order) - case insensitive
+    STUDENT_ID_PATTERNS = [re.compile(p) for p in (
         r'[A-Za-z]\d{6}[A-Za-z]',  # Example: B240253C or b250102a (1 letter + 6 digits + 1 letter)
         r'[A-Za-z]{2}\d{6}',       # Example: AB123456 or ab123456 (2 letters + 6 digits)
         r'\d{8,10}',               # Example: 12345678 (8-10 digits)
         r'[A-Za-z]\d{7}',          # Example: A1234567 or a1234567 (1 letter + 7 digits)
-    ]
+    )]
     
-    # Name extraction patterns
-    NAME_PATTERNS = [
+    # Name extraction patterns (compiled regex, tried in order)
+    NAME_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
         r'Name:\s*([A-Za-z\s]+)',
         r'Student:\s*([A-Za-z\s]+)',
         r'Prepared by:\s*([A-Za-z\s]+)',
-    ]
+    )]
     
     @staticmethod
     def validate():
@@ -0,0 +1,22 @@
+"""
+Gunicorn configuration for AutoAssess
+Usage: cd backend && gunicorn
+"""
+import os
+
+wsgi_app = 'wsgi:app'
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', 5000)}"
+
+# gevent workers let blocking Drive / MongoDB / report I/O yield so that many
+# concurrent requests can share one worker process, and CPU-bound extraction and
+# evaluation already run in the shared process pool, so one worker is the default.
+# Extra workers are safe: the Drive monitor runs only in the worker holding its lease.
+worker_class = 'gevent'
+workers = int(os.getenv('GUNICORN_WORKERS', 1))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+# Report generation and Drive downloads can take a while
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+
+accesslog = '-'
+errorlog = '-'
@@ -1,11 +1,23 @@
 """
 Assessment database model
 """
+from bisect import bisect_right
 from datetime import datetime
 
 class Assessment:
     """Assessment model representing evaluation results"""
     
+    # Lowest score for each letter grade, highest grade first; anything below is 'F'
+    GRADE_SCALE = [
+        (90, 'A+'), (85, 'A'), (80, 'A-'),
+        (75, 'B+'), (70, 'B'), (65, 'B-'),
+        (60, 'C+'), (55, 'C'), (50, 'C-'),
+        (45, 'D')
+    ]
+    # The same scale in ascending order, for bisect: GRADE_LETTERS[i] covers scores from GRADE_BOUNDS[i - 1]
+    GRADE_BOUNDS = [threshold for threshold, _ in reversed(GRADE_SCALE)]
+    GRADE_LETTERS = ['F'] + [grade for _, grade in reversed(GRADE_SCALE)]
+    
     @staticmethod
     def create(submission_id, scores, feedback):
         """Create new assessment document"""
@@ -34,25 +46,34 @@ class Assessment:
     @staticmethod
     def get_grade(total_score):
         """Convert score to letter grade"""
-        if total_score >= 90:
-            return 'A+'
-        elif total_score >= 85:
-            return 'A'
-        elif total_score >= 80:
-            return 'A-'
-        elif total_score >= 75:
-            return 'B+'
-        elif total_score >= 70:
-            return 'B'
-        elif total_score >= 65:
-            return 'B-'
-        elif total_score >= 60:
-            return 'C+'
-        elif total_score >= 55:
-            return 'C'
-        elif total_score >= 50:
-            return 'C-'
-        elif total_score >= 45:
-            return 'D'
-        else:
-            return 'F'
+        # Binary search over the band lower bounds; index 0 is below every band
+        return Assessment.GRADE_LETTERS[bisect_right(Assessment.GRADE_BOUNDS, total_score)]
+
+    @staticmethod
+    def grade_expression(score_field):
+        """MongoDB $switch expression that maps a score field to its letter grade"""
+        return {
+            '$switch': {
+                'branches': [
+                    {'case': {'$gte': [score_field, threshold]}, 'then': grade}
+                    for threshold, grade in Assessment.GRADE_SCALE
+                ],
+                'default': 'F'
+            }
+        }
+    
+    @staticmethod
+    def grade_bucket_stage(score_field):
+        """MongoDB $bucket stage counting documents per grade band
+        
+        Bucket _ids are the lower score bound of each band (see GRADE_SCALE).
+        """
+        boundaries = [0] + sorted(threshold for threshold, _ in Assessment.GRADE_SCALE) + [float('inf')]
+        return {
+            '$bucket': {
+                'groupBy': score_field,
+                'boundaries': boundaries,
+                'default': 'F',
+                'output': {'n': {'$sum': 1}}
+            }
+        }
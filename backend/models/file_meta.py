@@ -0,0 +1,30 @@
+"""
+Drive file metadata record
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass(slots=True)
+class FileMeta:
+    """Metadata for one Drive file as it moves through the monitor's pipeline"""
+    
+    id: str
+    name: str
+    mime_type: Optional[str] = None
+    size: int = 0
+    created_time: Optional[str] = None  # RFC 3339
+    modified_time: Optional[str] = None  # RFC 3339
+    md5_checksum: Optional[str] = None
+    
+    @classmethod
+    def from_drive(cls, data):
+        """Build from a Drive API file resource"""
+        return cls(
+            id=data['id'],
+            name=data['name'],
+            mime_type=data.get('mimeType'),
+            size=int(data.get('size') or 0),
+            created_time=data.get('createdTime'),
+            modified_time=data.get('modifiedTime'),
+            md5_checksum=data.get('md5Checksum')
+        )
@@ -0,0 +1,19 @@
+"""
+Student identity record
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass(slots=True)
+class StudentInfo:
+    """Student ID and name parsed from a filename or document content"""
+    
+    student_id: Optional[str] = None
+    student_name: Optional[str] = None
+    
+    def fill_missing(self, other):
+        """Take any field still missing from another StudentInfo"""
+        if not self.student_id:
+            self.student_id = other.student_id
+        if not self.student_name:
+            self.student_name = other.student_name
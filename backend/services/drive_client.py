@@ -0,0 +1,197 @@
+"""
+Async Google Drive client
+Talks to the Drive v3 REST API directly over aiohttp
+"""
+import asyncio
+import json
+import random
+import time
+import uuid
+from email import policy
+from email.parser import BytesParser
+from urllib.parse import quote
+import aiohttp
+from google.auth.transport.requests import Request
+
+DRIVE_API_URL = 'https://www.googleapis.com/drive/v3'
+DRIVE_BATCH_URL = 'https://www.googleapis.com/batch/drive/v3'
+BATCH_LIMIT = 100  # Drive accepts at most 100 calls per batch request
+DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Idle HTTPS connections are kept this long so consecutive polls skip the TCP/TLS handshake
+KEEPALIVE_TIMEOUT = 300
+DNS_CACHE_TTL = 300
+
+class TokenBucket:
+    """Async token-bucket rate limiter"""
+    
+    def __init__(self, capacity, refill_rate):
+        self.capacity = capacity
+        self.refill_rate = refill_rate  # tokens per second
+        self.tokens = float(capacity)
+        self.last = time.monotonic()
+        self.lock = asyncio.Lock()
+    
+    def refill(self):
+        """Add the tokens accrued since the last refill"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.refill_rate)
+        self.last = now
+    
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        # Waiters queue on the lock, so they are released one at a time rather than all at once
+        async with self.lock:
+            self.refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.refill_rate + random.uniform(0, 0.05))
+                self.refill()
+            self.tokens -= 1
+
+class DriveClient:
+    """Minimal async client for the Drive endpoints used by the monitor"""
+    
+    def __init__(self, credentials, max_concurrent_downloads=5, requests_per_minute=50):
+        self.credentials = credentials
+        self.session = None
+        self.token_lock = asyncio.Lock()
+        self.rate_limiter = TokenBucket(requests_per_minute, requests_per_minute / 60)
+        # Downloads plus one listing/metadata call can be in flight at once
+        self.pool_size = max_concurrent_downloads + 1
+        
+        # Cap in-flight requests so bursts of new files don't trip Drive's rate limits
+        self.download_sem = asyncio.Semaphore(max_concurrent_downloads)
+        self.list_sem = asyncio.Semaphore(1)
+    
+    def get_session(self):
+        """Get the pooled HTTP session, creating it on the running event loop"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=DNS_CACHE_TTL
+            )
+            self.session = aiohttp.ClientSession(connector=connector, raise_for_status=True)
+        return self.session
+    
+    async def auth_headers(self):
+        """Authorization header, refreshing the access token when it has expired"""
+        async with self.token_lock:
+            if not self.credentials.valid:
+                # google-auth refreshes synchronously; keep it off the event loop
+                await asyncio.to_thread(self.credentials.refresh, Request())
+        return {'Authorization': f'Bearer {self.credentials.token}'}
+    
+    async def list_files(self, query, fields, order_by=None, page_size=None, page_token=None):
+        """List one page of files matching a Drive query"""
+        params = {'q': query, 'fields': fields}
+        if order_by:
+            params['orderBy'] = order_by
+        if page_size:
+            params['pageSize'] = page_size
+        if page_token:
+            params['pageToken'] = page_token
+        
+        async with self.list_sem:
+            await self.rate_limiter.acquire()
+            async with self.get_session().get(f'{DRIVE_API_URL}/files', params=params,
+                                              headers=await self.auth_headers()) as response:
+                return await response.json()
+    
+    async def get_start_page_token(self):
+        """Get the token marking the current position of the changes feed"""
+        async with self.list_sem:
+            await self.rate_limiter.acquire()
+            async with self.get_session().get(f'{DRIVE_API_URL}/changes/startPageToken',
+                                              headers=await self.auth_headers()) as response:
+                return (await response.json())['startPageToken']
+    
+    async def list_changes(self, page_token, fields, page_size=None):
+        """List one page of changes since a changes token"""
+        params = {'pageToken': page_token, 'fields': fields, 'spaces': 'drive', 'includeRemoved': 'false'}
+        if page_size:
+            params['pageSize'] = page_size
+        
+        async with self.list_sem:
+            await self.rate_limiter.acquire()
+            async with self.get_session().get(f'{DRIVE_API_URL}/changes', params=params,
+                                              headers=await self.auth_headers()) as response:
+                return await response.json()
+    
+    async def watch_changes(self, page_token, channel_id, address, token, expiration_ms):
+        """Register a web_hook channel that receives a POST whenever the changes feed moves"""
+        body = {
+            'id': channel_id,
+            'type': 'web_hook',
+            'address': address,
+            'token': token,
+            'expiration': expiration_ms
+        }
+        await self.rate_limiter.acquire()
+        async with self.get_session().post(f'{DRIVE_API_URL}/changes/watch', params={'pageToken': page_token},
+                                           json=body, headers=await self.auth_headers()) as response:
+            return await response.json()
+    
+    async def stop_channel(self, channel_id, resource_id):
+        """Stop a notification channel"""
+        await self.rate_limiter.acquire()
+        async with self.get_session().post(f'{DRIVE_API_URL}/channels/stop',
+                                           json={'id': channel_id, 'resourceId': resource_id},
+                                           headers=await self.auth_headers()):
+            pass
+    
+    async def download(self, file_id, file_handle):
+        """Stream a file's content into a writable binary file object; returns the byte count"""
+        async with self.download_sem:
+            await self.rate_limiter.acquire()
+            async with self.get_session().get(f'{DRIVE_API_URL}/files/{file_id}', params={'alt': 'media'},
+                                              headers=await self.auth_headers()) as response:
+                size = 0
+                async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                    file_handle.write(chunk)
+                    size += len(chunk)
+                return size
+    
+    async def batch_get_metadata(self, file_ids, fields):
+        """Fetch metadata for many files using multipart/mixed batch requests
+        
+        Returns a dict of file ID to metadata; files that could not be fetched are omitted.
+        """
+        metadata = {}
+        for start in range(0, len(file_ids), BATCH_LIMIT):
+            chunk = file_ids[start:start + BATCH_LIMIT]
+            boundary = f'batch_{uuid.uuid4().hex}'
+            
+            parts = [
+                f'--{boundary}\r\n'
+                f'Content-Type: application/http\r\n'
+                f'Content-ID: <{index}>\r\n\r\n'
+                f'GET /drive/v3/files/{quote(file_id)}?fields={quote(fields)}\r\n\r\n'
+                for index, file_id in enumerate(chunk)
+            ]
+            body = ''.join(parts) + f'--{boundary}--\r\n'
+            
+            await self.rate_limiter.acquire()
+            headers = await self.auth_headers()
+            headers['Content-Type'] = f'multipart/mixed; boundary={boundary}'
+            async with self.get_session().post(DRIVE_BATCH_URL, data=body.encode(), headers=headers) as response:
+                content_type = response.headers['Content-Type']
+                payload = await response.read()
+            
+            # Each part wraps a full HTTP response: status line, headers, blank line, JSON body
+            message = BytesParser(policy=policy.HTTP).parsebytes(
+                f'Content-Type: {content_type}\r\n\r\n'.encode() + payload
+            )
+            for part in message.iter_parts():
+                status_line, _, rest = part.get_payload().partition('\r\n')
+                if status_line.split()[1] != '200':
+                    continue
+                result = json.loads(rest.split('\r\n\r\n', 1)[1])
+                metadata[result['id']] = result
+        
+        return metadata
+    
+    async def close(self):
+        """Close the HTTP session"""
+        if self.session and not self.session.closed:
+            await self.session.close()
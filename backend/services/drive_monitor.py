@@ -2,31 +2,89 @@
 Google Drive monitoring service
 Monitors a specific folder for new submissions
 """
-import time
 import os
+import asyncio
+import hmac
+import logging
+import random
+import socket
+import tempfile
+import threading
+import time
+import uuid
 from datetime import datetime
+import aiohttp
+from cachetools import LRUCache
 from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
-import io
+from pymongo import InsertOne
+from pymongo.errors import BulkWriteError
 
 from config import Config
+from models.file_meta import FileMeta
+from models.student_info import StudentInfo
 from utils.db_connection import db
-from utils.helpers import parse_student_info_from_filename, create_submission_record
-from services.extraction import DataExtractor
-from services.evaluator import AssignmentEvaluator
+from utils.helpers import extract_file_extension, parse_student_info_from_filename, create_submission_record
+from services.workers import process_pool, run_extraction, run_evaluation
+from services.drive_client import DriveClient
+
+log = logging.getLogger(__name__)
+
+# Document in db.monitor_state that holds the monitor's counters
+MONITOR_STATE_ID = 'drive'
+
+DUPLICATE_KEY_ERROR = 11000
+
+# Downloads stay in memory up to this size, then spill to a temporary file
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+# Drive field selectors, built once rather than on every call
+FILE_FIELDS = 'id,name,mimeType,size,createdTime,modifiedTime,md5Checksum'
+LIST_FIELDS = f'nextPageToken,files({FILE_FIELDS})'
+CHANGES_FIELDS = f'nextPageToken,newStartPageToken,changes(fileId,file({FILE_FIELDS},parents,trashed))'
+
+# Drive answers rate limiting with 403/429 and transient failures with 5xx
+RETRYABLE_STATUSES = (403, 429, 500, 502, 503, 504)
+MAX_RETRY_DELAY = 60
+
+# Only the process holding this lease in monitor_state polls Drive; holders renew it
+# every third of the TTL and another process takes over once it lapses
+LEADER_LEASE_TTL = 30
+
+# Drive caps change notification channels at one week
+WEBHOOK_CHANNEL_TTL = 7 * 24 * 3600
+
+# Processing pipeline: bounded queues between stages, and workers per CPU-side stage
+# (the CPU work itself runs in the shared process pool)
+PIPELINE_QUEUE_SIZE = 32
+PIPELINE_WORKERS = os.cpu_count() or 1
 
 class DriveMonitor:
     """Google Drive file monitoring service"""
     
     def __init__(self):
-        self.service = None
+        self.client = None
         self.is_running = False
-        self.last_check_time = None
-        self.files_processed = 0
-        self.extractor = DataExtractor()
-        self.evaluator = AssignmentEvaluator()
-        self.processed_file_ids = set()
+        self.retry_files = []  # errored files queued for another attempt on the next poll
+        
+        # Content extraction results keyed by (file ID, modifiedTime), so edits miss naturally.
+        # Only touched from the monitor's event loop, so no lock is needed.
+        self.extract_cache = LRUCache(maxsize=512)
+        self.high_watermark = None  # latest Drive createdTime already listed (RFC 3339)
+        self.changes_token = None  # Drive changes feed position; None until the first full listing
+        self.webhook_channel = None  # active push notification channel, if push notifications are configured
+        self.last_poll_time = 0
+        
+        # Settings used on every poll and for every listed file, read once
+        self.folder_id = Config.GOOGLE_DRIVE_FOLDER_ID
+        self.supported_exts = frozenset(ext.lower() for ext in Config.SUPPORTED_FILE_TYPES)
+        self.supported_mimes = frozenset(Config.SUPPORTED_MIME_TYPES)
+        self.page_size = Config.DRIVE_PAGE_SIZE
+        mime_filter = ' or '.join(f"mimeType='{mime}'" for mime in Config.SUPPORTED_MIME_TYPES)
+        self.folder_query = f"'{self.folder_id}' in parents and trashed=false and ({mime_filter})"
+        
+        # Event loop that runs all Drive I/O, started on first use
+        self.loop = None
+        self.loop_lock = threading.Lock()
         
         # Initialize Google Drive API
         self.initialize_drive_api()
@@ -36,7 +94,7 @@ class DriveMonitor:
         try:
             creds_path = os.path.abspath(Config.GOOGLE_CREDENTIALS_PATH)
             if not os.path.exists(creds_path):
-                print(f"✗ Google Drive credentials not found at: {creds_path}")
+                log.error("✗ Google Drive credentials not found at: %s", creds_path)
                 return
             
             credentials = service_account.Credentials.from_service_account_file(
@@ -44,199 +102,622 @@ class DriveMonitor:
                 scopes=['https://www.googleapis.com/auth/drive.readonly']
             )
             
-            self.service = build('drive', 'v3', credentials=credentials)
-            print("✓ Google Drive API initialized")
+            self.client = DriveClient(
+                credentials,
+                max_concurrent_downloads=Config.MAX_CONCURRENT_DOWNLOADS,
+                requests_per_minute=Config.DRIVE_REQUESTS_PER_MINUTE
+            )
+            log.info("✓ Google Drive API initialized")
             
         except Exception as e:
-            print(f"✗ Failed to initialize Google Drive API: {e}")
+            log.error("✗ Failed to initialize Google Drive API: %s", e)
+    
+    def is_configured(self):
+        """Check that Drive credentials and the folder ID are available"""
+        if not self.client:
+            log.error("✗ Cannot start monitoring: Google Drive API not initialized")
+            return False
+        
+        if not self.folder_id:
+            log.error("✗ Cannot start monitoring: GOOGLE_DRIVE_FOLDER_ID not configured")
+            return False
+        
+        return True
+    
+    def set_monitoring_active(self, active):
+        """Record whether monitoring should run; returns False if it already was in that state
+        
+        The flag lives in monitor_state so every worker process sees the same value.
+        """
+        db.monitor_state.update_one(
+            {'_id': MONITOR_STATE_ID},
+            {'$setOnInsert': {'monitoring_active': False}},
+            upsert=True
+        )
+        result = db.monitor_state.update_one(
+            {'_id': MONITOR_STATE_ID, 'monitoring_active': {'$ne': active}},
+            {'$set': {'monitoring_active': active}}
+        )
+        return result.modified_count == 1
+    
+    def owner_id(self):
+        """Identify this process as a holder of the monitor lease"""
+        return f"{socket.gethostname()}:{os.getpid()}"
+    
+    def acquire_leadership(self):
+        """Take or renew the monitor lease; returns False if monitoring is off or another process holds it"""
+        owner = self.owner_id()
+        now = time.time()
+        state = db.monitor_state.find_one_and_update(
+            {
+                '_id': MONITOR_STATE_ID,
+                'monitoring_active': True,
+                '$or': [{'leader': None}, {'leader.owner': owner}, {'leader.expires': {'$lt': now}}]
+            },
+            {'$set': {'leader': {'owner': owner, 'expires': now + LEADER_LEASE_TTL}}},
+            projection={'_id': 1}
+        )
+        return state is not None
+    
+    def release_leadership(self):
+        """Give up the monitor lease if this process holds it"""
+        db.monitor_state.update_one(
+            {'_id': MONITOR_STATE_ID, 'leader.owner': self.owner_id()},
+            {'$unset': {'leader': ''}}
+        )
     
     def start_monitoring(self):
-        """Start monitoring Google Drive folder"""
-        if not self.service:
-            print("✗ Cannot start monitoring: Google Drive API not initialized")
-            return
+        """Prepare for monitoring; returns False if Drive is not configured
         
-        if not Config.GOOGLE_DRIVE_FOLDER_ID:
-            print("✗ Cannot start monitoring: GOOGLE_DRIVE_FOLDER_ID not configured")
-            return
+        Polling itself is driven externally by calling poll_once on an interval.
+        """
+        if not self.is_configured():
+            return False
         
         self.is_running = True
-        print(f"✓ Started monitoring Google Drive folder")
-        print(f"  Checking every {Config.MONITORING_INTERVAL} seconds...")
         
-        # Load previously processed files
-        self.load_processed_files()
+        self.resync_error_files()
         
-        while self.is_running:
-            try:
-                self.check_for_new_files()
-                self.last_check_time = datetime.utcnow().isoformat()
-                time.sleep(Config.MONITORING_INTERVAL)
-            except Exception as e:
-                print(f"✗ Error during monitoring: {e}")
-                time.sleep(Config.MONITORING_INTERVAL)
+        state = db.monitor_state.find_one({'_id': MONITOR_STATE_ID}, {'high_watermark': 1, 'changes_token': 1}) or {}
+        self.high_watermark = state.get('high_watermark')
+        self.changes_token = state.get('changes_token')
+        
+        if Config.DRIVE_WEBHOOK_URL:
+            self.register_webhook()
+        
+        log.info("✓ Started monitoring Google Drive folder")
+        if self.webhook_channel:
+            log.info("  Push notifications active, safety check every %d seconds...", Config.WEBHOOK_SAFETY_POLL_INTERVAL)
+        else:
+            log.info("  Checking every %d seconds...", Config.MONITORING_INTERVAL)
+        return True
+    
+    def request_poll(self):
+        """Make the next scheduled tick check Drive even while push notifications are active
+        
+        The request is stored in monitor_state because the notification may reach a
+        different worker from the one running the poll job.
+        """
+        db.monitor_state.update_one(
+            {'_id': MONITOR_STATE_ID},
+            {'$set': {'poll_requested': True}},
+            upsert=True
+        )
+    
+    def take_poll_request(self):
+        """Clear a pending poll request; returns True if there was one"""
+        state = db.monitor_state.find_one_and_update(
+            {'_id': MONITOR_STATE_ID, 'poll_requested': True},
+            {'$unset': {'poll_requested': ''}},
+            projection={'_id': 1}
+        )
+        return state is not None
+    
+    def run(self, coro):
+        """Run a coroutine on the monitor's event loop and wait for its result
+        
+        The loop lives in a background thread for the lifetime of the monitor so the
+        Drive HTTP session and its connections are reused across polls and requests.
+        """
+        with self.loop_lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                threading.Thread(target=self.loop.run_forever, name='drive-monitor', daemon=True).start()
+        
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+    
+    def poll_once(self):
+        """Run a single check of the Drive folder"""
+        if not self.is_running:
+            return
+        
+        try:
+            if self.webhook_channel:
+                # Renew the push channel shortly before it lapses; if that fails we are back to plain polling
+                if self.webhook_channel['expiration'] - time.time() < Config.WEBHOOK_SAFETY_POLL_INTERVAL:
+                    self.unregister_webhook()
+                    self.register_webhook()
+                
+                # With push notifications, ticks only check Drive when notified or as a periodic safety net
+                requested = self.take_poll_request()
+                due = time.time() - self.last_poll_time >= Config.WEBHOOK_SAFETY_POLL_INTERVAL
+                if self.webhook_channel and not requested and not due:
+                    return
+            
+            self.last_poll_time = time.time()
+            self.run(self.check_for_new_files())
+            db.monitor_state.update_one(
+                {'_id': MONITOR_STATE_ID},
+                {'$set': {'last_check_time': datetime.utcnow()}},
+                upsert=True
+            )
+        except Exception as e:
+            log.error("✗ Error during monitoring: %s", e)
     
     def stop_monitoring(self):
         """Stop monitoring"""
         self.is_running = False
-        print("✓ Monitoring stopped")
+        self.unregister_webhook()
+        log.info("✓ Monitoring stopped")
+    
+    def register_webhook(self):
+        """Subscribe DRIVE_WEBHOOK_URL to Drive change notifications; returns True on success"""
+        # Without the token every notification would be rejected, leaving only the hourly safety poll
+        if not Config.DRIVE_WEBHOOK_TOKEN:
+            log.warning("⚠ DRIVE_WEBHOOK_URL is set but DRIVE_WEBHOOK_TOKEN is not; polling instead of push notifications")
+            return False
+        
+        try:
+            page_token = self.changes_token or self.run(self.client.get_start_page_token())
+            channel = self.run(self.client.watch_changes(
+                page_token,
+                channel_id=uuid.uuid4().hex,
+                address=Config.DRIVE_WEBHOOK_URL,
+                token=Config.DRIVE_WEBHOOK_TOKEN,
+                expiration_ms=int((time.time() + WEBHOOK_CHANNEL_TTL) * 1000)
+            ))
+            
+            self.webhook_channel = {
+                'id': channel['id'],
+                'resource_id': channel['resourceId'],
+                'expiration': int(channel['expiration']) / 1000
+            }
+            # Stored so any worker receiving the notification can validate it
+            db.monitor_state.update_one(
+                {'_id': MONITOR_STATE_ID},
+                {'$set': {'webhook_channel': self.webhook_channel}},
+                upsert=True
+            )
+            log.info("✓ Registered Google Drive push notifications")
+            return True
+            
+        except Exception as e:
+            log.warning("⚠ Could not register Drive push notifications, polling instead: %s", e)
+            self.webhook_channel = None
+            return False
+    
+    def unregister_webhook(self):
+        """Stop the push notification channel, if one is active"""
+        if not self.webhook_channel:
+            return
+        
+        try:
+            self.run(self.client.stop_channel(self.webhook_channel['id'], self.webhook_channel['resource_id']))
+        except Exception as e:
+            log.warning("⚠ Error stopping Drive push notifications: %s", e)
+        
+        # Leave the record alone if another process has registered a newer channel
+        db.monitor_state.update_one(
+            {'_id': MONITOR_STATE_ID, 'webhook_channel.id': self.webhook_channel['id']},
+            {'$unset': {'webhook_channel': ''}}
+        )
+        self.webhook_channel = None
+    
+    def is_valid_notification(self, channel_id, channel_token):
+        """Check a push notification's channel headers against the registered channel"""
+        if not Config.DRIVE_WEBHOOK_TOKEN or not channel_token:
+            return False
+        
+        state = db.monitor_state.find_one({'_id': MONITOR_STATE_ID}, {'webhook_channel': 1}) or {}
+        channel = state.get('webhook_channel')
+        return (channel is not None and channel['id'] == channel_id
+                and hmac.compare_digest(channel_token.encode(), Config.DRIVE_WEBHOOK_TOKEN.encode()))
+    
+    def _batch_get_metadata(self, ids):
+        """Fetch current Drive metadata for many files in batched round-trips"""
+        return self.run(self.client.batch_get_metadata(
+            ids,
+            fields=FILE_FIELDS
+        ))
     
-    def load_processed_files(self):
-        """Load previously processed file IDs from database"""
+    def resync_error_files(self):
+        """Retry errored submissions whose Drive file has changed since the failed attempt"""
         try:
-            submissions = db.submissions.find({}, {'file_id': 1})
-            self.processed_file_ids = {sub['file_id'] for sub in submissions}
-            print(f"  Loaded {len(self.processed_file_ids)} previously processed files")
+            errored = list(db.submissions.find({'status': 'error'}, {'file_id': 1, 'modified_time': 1}))
+            if not errored:
+                return
+            
+            metadata = self._batch_get_metadata([sub['file_id'] for sub in errored])
+            changed = [
+                sub for sub in errored
+                if sub['file_id'] in metadata and metadata[sub['file_id']].get('modifiedTime') != sub.get('modified_time')
+            ]
+            
+            if changed:
+                # Drop the error records and hand the files to the next poll, since the
+                # changes feed has already moved past their modification
+                db.submissions.delete_many({'_id': {'$in': [sub['_id'] for sub in changed]}})
+                db.mark_submissions_changed()
+                self.retry_files.extend(FileMeta.from_drive(metadata[sub['file_id']]) for sub in changed)
+                log.info("  Retrying %d errored file(s) modified since their last attempt", len(changed))
         except Exception as e:
-            print(f"✗ Error loading processed files: {e}")
+            log.error("✗ Error resyncing errored files: %s", e)
+    
+    async def list_folder_files(self):
+        """List supported files in the folder created since the watermark (cold start)"""
+        # Query for supported files in the specified folder, created since the last listing
+        query = self.folder_query
+        if self.high_watermark:
+            # Inclusive so files sharing the watermark's timestamp are not lost
+            query += f" and createdTime >= '{self.high_watermark}'"
+        
+        # Walk the folder listing newest first, stopping at the first file that already has a submission
+        files = []
+        page_token = None
+        while True:
+            results = await self.client.list_files(
+                query,
+                fields=LIST_FIELDS,
+                order_by="createdTime desc",
+                page_size=self.page_size,
+                page_token=page_token
+            )
+            page = [FileMeta.from_drive(file) for file in results.get('files', [])]
+            
+            known = await self.first_known_file(page)
+            if known is not None:
+                # Everything older was ingested before it; files sharing its timestamp may sort
+                # either side of it, so keep those for the dedupe check
+                cutoff = page[known].created_time
+                files.extend(file for index, file in enumerate(page) if index < known or file.created_time == cutoff)
+                if page[-1].created_time != cutoff:
+                    break
+            else:
+                files.extend(page)
+            
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+        
+        return files
+    
+    async def first_known_file(self, page):
+        """Index of the first file in a listing page that already has a submission, or None"""
+        if not page:
+            return None
+        
+        known_ids = set(await asyncio.to_thread(
+            db.submissions.distinct, 'file_id', {'file_id': {'$in': [file.id for file in page]}}
+        ))
+        return next((index for index, file in enumerate(page) if file.id in known_ids), None)
+    
+    async def list_changed_files(self):
+        """List supported files in the folder that changed since the saved changes token
+        
+        Returns the files and the token to resume from on the next poll.
+        """
+        files = []
+        page_token = self.changes_token
+        while True:
+            results = await self.client.list_changes(
+                page_token,
+                fields=CHANGES_FIELDS,
+                page_size=self.page_size
+            )
+            
+            for change in results.get('changes', []):
+                file = change.get('file')
+                if (file and not file.get('trashed')
+                        and self.folder_id in file.get('parents', [])
+                        and file.get('mimeType') in self.supported_mimes):
+                    files.append(FileMeta.from_drive(file))
+            
+            if 'newStartPageToken' in results:
+                return files, results['newStartPageToken']
+            page_token = results['nextPageToken']
     
-    def check_for_new_files(self):
+    async def check_for_new_files(self):
         """Check for new files in Google Drive folder"""
         try:
-            # Query for files in the specified folder
-            query = f"'{Config.GOOGLE_DRIVE_FOLDER_ID}' in parents and trashed=false"
+            if self.changes_token:
+                files, next_token = await self.list_changed_files()
+            else:
+                # Cold start: take the changes token first so nothing added during the listing is missed
+                next_token = await self.client.get_start_page_token()
+                files = await self.list_folder_files()
             
-            results = self.service.files().list(
-                q=query,
-                fields="files(id, name, mimeType, size, createdTime, modifiedTime)",
-                orderBy="createdTime desc"
-            ).execute()
+            retry_files, self.retry_files = self.retry_files, []
+            files += retry_files
             
-            files = results.get('files', [])
+            # Skip files that already have a submission; file_id is indexed, so this stays cheap
+            listed_ids = [file.id for file in files]
+            seen_ids = set(await asyncio.to_thread(
+                db.submissions.distinct, 'file_id', {'file_id': {'$in': listed_ids}}
+            )) if listed_ids else set()
             
-            # Process new files
-            new_files_count = 0
+            new_files = []
             for file in files:
-                if file['id'] not in self.processed_file_ids:
+                if file.id not in seen_ids:
+                    seen_ids.add(file.id)
                     # Check if file type is supported
-                    file_ext = os.path.splitext(file['name'])[1].lower()
-                    if file_ext in Config.SUPPORTED_FILE_TYPES:
-                        self.process_new_file(file)
-                        self.processed_file_ids.add(file['id'])
-                        new_files_count += 1
+                    if extract_file_extension(file.name) in self.supported_exts:
+                        new_files.append(file)
             
-            if new_files_count > 0:
-                print(f"✓ Processed {new_files_count} new file(s)")
+            if new_files:
+                # Process new files through the pipeline, buffering the resulting documents for one write per cycle
+                new_submissions = await self.run_pipeline(new_files)
+                if not await asyncio.to_thread(self.save_submissions, new_submissions):
+                    self.retry_files = retry_files
+                    return
+                log.info("✓ Processed %d new file(s)", len(new_submissions))
+            
+            newest = max((file.created_time or '' for file in files), default='')
+            if newest:
+                self.advance_watermark(newest)
+            self.save_changes_token(next_token)
             
         except Exception as e:
-            print(f"✗ Error checking for new files: {e}")
+            log.error("✗ Error checking for new files: %s", e)
     
-    def process_new_file(self, file_info):
-        """Process a newly detected file"""
+    async def run_pipeline(self, files):
+        """Run files through download -> extract -> evaluate stages joined by bounded queues
+        
+        Each stage has its own workers, so evaluating one file no longer holds up the next
+        download. Returns one submission document (evaluated or error) per file.
+        """
+        download_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        extract_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        evaluate_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        submissions = []
+        
+        async def stage_worker(queue, handle):
+            while True:
+                file_info, item = await queue.get()
+                try:
+                    await handle(file_info, item)
+                except Exception as e:
+                    log.error("  ✗ Error processing file: %s", e)
+                    submissions.append(self.error_submission(file_info, e))
+                finally:
+                    queue.task_done()
+        
+        async def download(file_info, _):
+            log.info("📄 Processing: %s", file_info.name)
+            file_content = await self.download_file_async(file_info.id)
+            await extract_queue.put((file_info, file_content))
+        
+        async def extract(file_info, file_content):
+            with file_content:
+                submission_data = await self.extract_submission(file_info, file_content)
+            await evaluate_queue.put((file_info, submission_data))
+        
+        async def evaluate(file_info, submission_data):
+            submissions.append(await self.evaluate_submission(submission_data))
+        
+        workers = (
+            [asyncio.create_task(stage_worker(download_queue, download)) for _ in range(Config.MAX_CONCURRENT_DOWNLOADS)]
+            + [asyncio.create_task(stage_worker(extract_queue, extract)) for _ in range(PIPELINE_WORKERS)]
+            + [asyncio.create_task(stage_worker(evaluate_queue, evaluate)) for _ in range(PIPELINE_WORKERS)]
+        )
+        
         try:
-            print(f"\n📄 Processing: {file_info['name']}")
-            
-            # Extract student info from filename
-            student_info = parse_student_info_from_filename(file_info['name'])
-            
-            # Download file content for analysis
-            file_content = self.download_file_content(file_info['id'])
+            originals = await asyncio.to_thread(self.find_evaluated_by_checksum, files)
+            for file_info in files:
+                original = originals.get(file_info.md5_checksum)
+                if original:
+                    # Same bytes were already assessed; reuse that result instead of downloading again
+                    submissions.append(self.duplicate_submission(file_info, original))
+                else:
+                    await download_queue.put((file_info, None))
             
-            # Extract additional info from content if needed
-            if not student_info['student_id'] or not student_info['student_name']:
-                extracted_info = self.extractor.extract_from_content(
-                    file_content, 
-                    file_info['name']
-                )
-                
-                # Merge extracted info
-                if not student_info['student_id']:
-                    student_info['student_id'] = extracted_info.get('student_id')
-                if not student_info['student_name']:
-                    student_info['student_name'] = extracted_info.get('student_name')
-            
-            # Extract full text content from file for evaluation
-            extracted_text = self.extractor.extract_assignment_content(
-                file_content,
-                file_info['name']
-            )
-            
-            # Create submission record
-            submission_data = create_submission_record(file_info, student_info)
-            # Store extracted text (limit to 5000 chars for database)
-            submission_data['file_content'] = extracted_text[:5000] if extracted_text else ""
-            
-            # Insert into database
-            result = db.submissions.insert_one(submission_data)
-            submission_data['_id'] = result.inserted_id
-            
-            print(f"  ✓ Student ID: {student_info['student_id']}")
-            print(f"  ✓ Student Name: {student_info['student_name']}")
-            print(f"  ✓ Saved to database")
-            
-            # Automatically evaluate the submission
-            print(f"  ⚙ Evaluating submission...")
-            assessment = self.evaluator.evaluate(submission_data)
-            
-            # Update submission with assessment
-            db.submissions.update_one(
-                {'_id': result.inserted_id},
-                {
-                    '$set': {
-                        'assessment': assessment,
-                        'status': 'evaluated',
-                        'evaluated_at': datetime.utcnow()
-                    }
-                }
+            # Each stage hands its item on before marking it done, so joining in order drains everything
+            await download_queue.join()
+            await extract_queue.join()
+            await evaluate_queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        
+        return submissions
+    
+    def find_evaluated_by_checksum(self, files):
+        """Map md5Checksum to an already evaluated submission with identical content"""
+        checksums = [file.md5_checksum for file in files if file.md5_checksum]
+        if not checksums:
+            return {}
+        
+        originals = db.submissions.find(
+            {'md5_checksum': {'$in': checksums}, 'status': 'evaluated'},
+            {'md5_checksum': 1, 'student_id': 1, 'student_name': 1, 'file_content': 1, 'assessment': 1}
+        )
+        return {original['md5_checksum']: original for original in originals}
+    
+    def duplicate_submission(self, file_info, original):
+        """Submission document for a re-upload of content that was already evaluated"""
+        log.info("📄 Processing: %s (unchanged content, reusing earlier assessment)", file_info.name)
+        
+        student_info = parse_student_info_from_filename(file_info.name)
+        # Identical content would yield the same content-derived info as the original
+        student_info.fill_missing(StudentInfo(original.get('student_id'), original.get('student_name')))
+        
+        submission_data = create_submission_record(file_info, student_info)
+        submission_data['file_content'] = original.get('file_content', '')
+        submission_data['assessment'] = original['assessment']
+        submission_data['duplicate_of'] = original['_id']
+        submission_data['status'] = 'evaluated'
+        submission_data['evaluated_at'] = datetime.utcnow()
+        return submission_data
+    
+    def error_submission(self, file_info, error):
+        """Submission document recording a file that could not be processed"""
+        error_submission = create_submission_record(file_info, StudentInfo('UNKNOWN', 'UNKNOWN'))
+        error_submission['status'] = 'error'
+        error_submission['error_message'] = str(error)
+        return error_submission
+    
+    async def extract_submission(self, file_info, file_content):
+        """Build the submission document for a downloaded file, before evaluation"""
+        # Extract student info from filename
+        student_info = parse_student_info_from_filename(file_info.name)
+        needs_content_info = not student_info.student_id or not student_info.student_name
+        
+        cache_key = (file_info.id, file_info.modified_time)
+        cached = self.extract_cache.get(cache_key)
+        if cached is None or (needs_content_info and cached[0] is None):
+            # Parsing runs in a worker process, which needs the raw bytes rather than the spooled file
+            file_content.seek(0)
+            cached = await asyncio.get_running_loop().run_in_executor(
+                process_pool, run_extraction, file_content.read(), file_info.name, needs_content_info
             )
+            self.extract_cache[cache_key] = cached
+        extracted_info, extracted_text = cached
+        
+        # Merge info extracted from content if the filename was missing it
+        if needs_content_info:
+            student_info.fill_missing(extracted_info)
+        
+        # Create submission record
+        submission_data = create_submission_record(file_info, student_info)
+        # Store extracted text (limit to 5000 chars for database)
+        submission_data['file_content'] = extracted_text[:5000] if extracted_text else ""
+        
+        log.info("  ✓ Student ID: %s", student_info.student_id)
+        log.info("  ✓ Student Name: %s", student_info.student_name)
+        return submission_data
+    
+    async def evaluate_submission(self, submission_data):
+        """Evaluate a submission document in a worker process so it is stored already assessed"""
+        log.debug("  ⚙ Evaluating submission...")
+        assessment = await asyncio.get_running_loop().run_in_executor(process_pool, run_evaluation, submission_data)
+        
+        submission_data['assessment'] = assessment
+        submission_data['status'] = 'evaluated'
+        submission_data['evaluated_at'] = datetime.utcnow()
+        
+        log.info("  ✓ Evaluation complete - Score: %s/100", assessment['total_score'])
+        return submission_data
+    
+    def save_submissions(self, submissions):
+        """Insert a poll cycle's submissions in one unordered bulk write; returns True if all landed"""
+        try:
+            db.submissions.bulk_write([InsertOne(sub) for sub in submissions], ordered=False)
+            db.mark_submissions_changed()
+            log.info("  ✓ Saved %d submission(s) to database", len(submissions))
+        except BulkWriteError as e:
+            # Unordered, so the rest of the batch was still written
+            db.mark_submissions_changed()
             
-            print(f"  ✓ Evaluation complete - Score: {assessment['total_score']}/100")
-            
-            self.files_processed += 1
+            # The unique file_id index rejects files another worker already ingested
+            errors = [err for err in e.details.get('writeErrors', []) if err.get('code') != DUPLICATE_KEY_ERROR]
+            if errors:
+                log.error("  ✗ Error saving submissions: %s", errors)
+                return False
             
+            duplicates = {err['index'] for err in e.details['writeErrors']}
+            submissions = [sub for index, sub in enumerate(submissions) if index not in duplicates]
+            log.info("  ✓ Saved %d submission(s) to database, skipped %d duplicate(s)", len(submissions), len(duplicates))
+        
+        evaluated_count = sum(1 for sub in submissions if sub['status'] == 'evaluated')
+        if evaluated_count:
+            # Atomic, shared across workers and kept across restarts
+            db.monitor_state.update_one(
+                {'_id': MONITOR_STATE_ID},
+                {'$inc': {'files_processed': evaluated_count}},
+                upsert=True
+            )
+        return True
+    
+    def advance_watermark(self, created_time):
+        """Persist the newest createdTime seen so later listings only return newer files"""
+        # RFC 3339 timestamps from Drive are all UTC, so they compare correctly as strings
+        if self.high_watermark and created_time <= self.high_watermark:
+            return
+        
+        self.high_watermark = created_time
+        db.monitor_state.update_one(
+            {'_id': MONITOR_STATE_ID},
+            {'$set': {'high_watermark': created_time}},
+            upsert=True
+        )
+    
+    def save_changes_token(self, token):
+        """Persist the changes feed position so the next poll only sees newer changes"""
+        if token == self.changes_token:
+            return
+        
+        self.changes_token = token
+        db.monitor_state.update_one(
+            {'_id': MONITOR_STATE_ID},
+            {'$set': {'changes_token': token}},
+            upsert=True
+        )
+    
+    async def download_file_async(self, file_id):
+        """Download file content from Google Drive into a spooled temporary file
+        
+        The caller owns the returned file object and should close it when done.
+        """
+        file_handle = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        
+        async def download():
+            # Discard any partial content left by a failed attempt
+            file_handle.seek(0)
+            file_handle.truncate()
+            return await self.client.download(file_id, file_handle)
+        
+        try:
+            size = await self.with_retry(download)
+            log.info("  ✓ Downloaded %d bytes from Google Drive", size)
+            return file_handle
         except Exception as e:
-            print(f"  ✗ Error processing file: {e}")
-            
-            # Save as error submission
+            log.error("  ✗ Error downloading file from Google Drive: %s", e)
+            file_handle.close()
+            raise
+    
+    async def with_retry(self, fn, *, max_attempts=5):
+        """Await fn(), retrying rate-limit, server and connection errors with exponential backoff
+        
+        Jitter keeps concurrent pipeline workers from retrying in lockstep.
+        """
+        for attempt in range(max_attempts):
             try:
-                error_submission = create_submission_record(file_info, {'student_id': 'UNKNOWN', 'student_name': 'UNKNOWN'})
-                error_submission['status'] = 'error'
-                error_submission['error_message'] = str(e)
-                db.submissions.insert_one(error_submission)
-            except:
-                pass
+                return await fn()
+            except (aiohttp.ClientResponseError, aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if isinstance(e, aiohttp.ClientResponseError) and e.status not in RETRYABLE_STATUSES:
+                    raise
+                if attempt == max_attempts - 1:
+                    raise
+                
+                delay = min(MAX_RETRY_DELAY, 2 ** attempt) + random.uniform(0, 1)
+                log.warning("  ⚠ Drive request failed (%s), retrying in %.1fs...", e, delay)
+                await asyncio.sleep(delay)
     
     def download_file_content(self, file_id):
-        """Download file content from Google Drive"""
+        """Download file content from Google Drive, blocking until it arrives"""
         try:
             # Re-initialize credentials if needed
-            if not self.service:
-                print("  ⚠ Drive service not initialized, attempting to reinitialize...")
+            if not self.client:
+                log.warning("  ⚠ Drive service not initialized, attempting to reinitialize...")
                 self.initialize_drive_api()
-                if not self.service:
-                    print("  ✗ Failed to reinitialize Drive service")
+                if not self.client:
+                    log.error("  ✗ Failed to reinitialize Drive service")
                     return b""
             
-            request = self.service.files().get_media(fileId=file_id)
-            file_handle = io.BytesIO()
-            downloader = MediaIoBaseDownload(file_handle, request)
-            
-            done = False
-            while not done:
-                status, done = downloader.next_chunk()
-            
-            file_handle.seek(0)
-            content = file_handle.read()
-            print(f"  ✓ Downloaded {len(content)} bytes from Google Drive")
-            return content
+            with self.run(self.download_file_async(file_id)) as file_handle:
+                file_handle.seek(0)
+                return file_handle.read()
             
         except Exception as e:
-            print(f"  ✗ Error downloading file from Google Drive: {e}")
-            # Try reinitializing and retry once
-            try:
-                print("  → Attempting to reinitialize Google Drive API...")
-                self.initialize_drive_api()
-                if self.service:
-                    request = self.service.files().get_media(fileId=file_id)
-                    file_handle = io.BytesIO()
-                    downloader = MediaIoBaseDownload(file_handle, request)
-                    done = False
-                    while not done:
-                        status, done = downloader.next_chunk()
-                    file_handle.seek(0)
-                    content = file_handle.read()
-                    print(f"  ✓ Downloaded {len(content)} bytes after retry")
-                    return content
-            except Exception as retry_error:
-                print(f"  ✗ Retry failed: {retry_error}")
+            log.error("  ✗ Download failed: %s", e)
             return b""
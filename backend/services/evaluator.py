@@ -3,165 +3,389 @@ Assignment evaluation service
 Evaluates programming logic assignments based on rubric
 """
 import re
+import copy
+import hashlib
+import threading
+from dataclasses import dataclass
+from itertools import repeat
+from operator import itemgetter
+from cachetools import LRUCache
 from config import Config
 from models.assessment import Assessment
 
+try:
+    # Aho-Corasick finds every rubric keyword in one pass over the text
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    # PCRE2 JIT-compiles patterns to native code; stdlib re is the fallback
+    import pcre2
+    PCRE2_AVAILABLE = True
+except ImportError:
+    PCRE2_AVAILABLE = False
+
+def pcre2_pattern(pattern, ignore_case):
+    """Rewrite a re pattern so PCRE2 matches exactly the same text"""
+    # re's \s also covers \x1c-\x1f, and its \w excludes combining marks (\b is only used before a word)
+    pattern = pattern.replace(r'\s', r'[\s\x1c-\x1f]').replace(r'\b', r'(?<![\p{L}\p{N}_])')
+    if ignore_case:
+        # re also folds the Turkish dotted and dotless I onto i
+        pattern = pattern.replace('a-z', 'a-z\u0130\u0131').replace('i', '[i\u0130\u0131]')
+    return pattern
+
+def compile_pattern(pattern, ignore_case=False, multiline=False):
+    """Compile a pattern scanned over whole submissions, with PCRE2 when available"""
+    if PCRE2_AVAILABLE:
+        flags = (pcre2.IGNORECASE if ignore_case else 0) | (pcre2.MULTILINE if multiline else 0)
+        return pcre2.compile(pcre2_pattern(pattern, ignore_case), flags=flags)
+    return re.compile(pattern, (re.IGNORECASE if ignore_case else 0) | (re.MULTILINE if multiline else 0))
+
+# Patterns compiled once at import rather than on every evaluation
+LOGIC_VAR_RE = compile_pattern(r'\b[a-z_][a-z0-9_]*\s*=|variable|var\s+|data|value|store', ignore_case=True)
+PSEUDO_VAR_PATTERNS = [compile_pattern(p, ignore_case=True) for p in (r'\b[a-z_][a-z0-9_]*\s*=', r'variable', r'set\s+', r'let\s+', r'get\s+')]
+# re's \s without the newline, spelled out so both engines agree and no match runs past its line
+LINE_SPACE = '\t\x0b\x0c\r\x1c-\x1f \x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000'
+HEADER_RE = compile_pattern(rf'^(?:[A-Z][A-Za-z{LINE_SPACE}]+:|#+[{LINE_SPACE}]+|\d+\.|[A-Z][A-Za-z{LINE_SPACE}]{{3,}}$)', multiline=True)
+LONG_RUN_RE = compile_pattern(r'[a-z]{80,}')
+INDENTS = ('    ', '\t')
+
+# Rubric keywords, all lowercase; they are matched as substrings of the lowercased content
+PROBLEM_KEYWORDS = frozenset({'problem', 'objective', 'goal', 'requirement', 'input', 'output', 'task', 'assignment', 'question', 'need', 'ask'})
+SOLUTION_KEYWORDS = frozenset({'algorithm', 'solution', 'approach', 'method', 'process', 'steps', 'procedure', 'way', 'how'})
+CONDITIONAL_KEYWORDS = frozenset({'if', 'else', 'when', 'case'})
+LOOP_KEYWORDS = frozenset({'while', 'for', 'repeat', 'loop', 'iterate', 'do while', 'until', 'each'})
+EDGE_KEYWORDS = frozenset({'edge', 'validation', 'error', 'check', 'validate', 'boundary', 'condition', 'test'})
+FLOWCHART_KEYWORDS = frozenset({'flowchart', 'flow chart', 'diagram', 'flow', 'chart', 'visual', 'graph', 'figure'})
+FLOWCHART_SYMBOLS = frozenset({'start', 'end', 'process', 'decision', 'input', 'output', 'step', 'box', 'action'})
+VISUAL_KEYWORDS = frozenset({'show', 'display', 'illustrate', 'represent', 'draw'})
+PSEUDO_KEYWORDS = frozenset({'pseudocode', 'pseudo code', 'pseudo', 'code', 'algorithm', 'logic', 'program'})
+CONTROL_KEYWORDS = frozenset({'if', 'then', 'else', 'while', 'for', 'repeat', 'loop', 'do', 'when'})
+THINKING_KEYWORDS = frozenset({'calculate', 'compute', 'determine', 'find', 'get', 'set', 'update'})
+COMMENT_INDICATORS = frozenset({'//', '/*', '#', 'comment', 'note', 'remarks', 'explanation', 'describe'})
+EXPLANATION_KEYWORDS = frozenset({'explain', 'description', 'purpose', 'because', 'this will', 'in order to', 'to', 'function', 'used for', 'how', 'why', 'what'})
+
+# Plain terms checked on their own in the flowchart and pseudocode categories
+STRUCTURE_KEYWORDS = frozenset({'arrow', 'direction', 'next', 'start', 'begin', 'end', 'stop'})
+
+ALL_KEYWORDS = (
+    PROBLEM_KEYWORDS | SOLUTION_KEYWORDS | CONDITIONAL_KEYWORDS | LOOP_KEYWORDS | EDGE_KEYWORDS
+    | FLOWCHART_KEYWORDS | FLOWCHART_SYMBOLS | VISUAL_KEYWORDS | PSEUDO_KEYWORDS | CONTROL_KEYWORDS
+    | THINKING_KEYWORDS | COMMENT_INDICATORS | EXPLANATION_KEYWORDS | STRUCTURE_KEYWORDS
+)
+
+if AHOCORASICK_AVAILABLE:
+    KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for keyword in ALL_KEYWORDS:
+        KEYWORD_AUTOMATON.add_word(keyword, keyword)
+    KEYWORD_AUTOMATON.make_automaton()
+
+def find_keywords(lower):
+    """Set of rubric keywords occurring anywhere in lowercased text"""
+    if AHOCORASICK_AVAILABLE:
+        # Reports every occurrence, including keywords nested inside longer ones; map()
+        # keeps the per-occurrence loop in C
+        return frozenset(map(itemgetter(1), KEYWORD_AUTOMATON.iter(lower)))
+    return frozenset(keyword for keyword in ALL_KEYWORDS if keyword in lower)
+
+# Category labels used in overall feedback, e.g. 'logic_design' -> 'Logic Design'
+CATEGORY_NAMES = {category: category.replace('_', ' ').title() for category in Config.RUBRIC}
+
+@dataclass(frozen=True, slots=True)
+class CategoryResult:
+    """Score and feedback for one rubric category"""
+    
+    score: float
+    max_score: float
+    percentage: float
+    feedback: list
+    
+    def as_dict(self):
+        """Breakdown entry as stored with the assessment"""
+        return {
+            'score': self.score,
+            'max_score': self.max_score,
+            'percentage': self.percentage,
+            'feedback': self.feedback
+        }
+
+def category_result(score, max_points, weight, feedback):
+    """Scale a raw category score (out of max_points) to the rubric weight"""
+    final_score = min((score / max_points) * weight, weight)
+    
+    return CategoryResult(round(final_score, 2), weight, round((final_score / weight) * 100, 2), feedback)
+
+@dataclass(frozen=True, slots=True)
+class ContentStats:
+    """Views and counts of submission text shared by every rubric category"""
+    
+    lower: str
+    keywords: frozenset  # rubric keywords present in the content
+    lines: list
+    length: int
+    stripped_length: int
+    meaningful_words: int  # words longer than two characters that are not plain numbers
+    unique_words: int  # distinct meaningful words, case-insensitive
+    non_empty_lines: int
+    indented_lines: int  # lines starting with four spaces or a tab
+    
+    @classmethod
+    def from_content(cls, content):
+        """Split and count the content in one go, lowercasing it only once"""
+        lower = content.lower()
+        # Lowercasing never adds or removes whitespace, so both splits line up word for word
+        meaningful = [lw for w, lw in zip(content.split(), lower.split()) if len(w) > 2 and not w.isdigit()]
+        lines = content.split('\n')
+        return cls(
+            lower=lower,
+            keywords=find_keywords(lower),
+            lines=lines,
+            length=len(content),
+            stripped_length=len(content.strip()),
+            meaningful_words=len(meaningful),
+            unique_words=len(set(meaningful)),
+            # map() keeps both per-line scans in C
+            non_empty_lines=sum(map(bool, map(str.strip, lines))),
+            indented_lines=sum(map(str.startswith, lines, repeat(INDENTS)))
+        )
+
 class AssignmentEvaluator:
     """Rubric-based assignment evaluator"""
     
     def __init__(self):
         self.rubric = Config.RUBRIC
+        self.category_evaluators = {
+            'logic_design': self.evaluate_logic_design,
+            'flowchart': self.evaluate_flowchart,
+            'pseudocode': self.evaluate_pseudocode,
+            'formatting': self.evaluate_formatting,
+            'documentation': self.evaluate_documentation
+        }
+        
+        # Assessments keyed by content digest, since scoring depends only on the text
+        self.cache = LRUCache(maxsize=512)
+        self.cache_lock = threading.Lock()
     
-    def evaluate(self, submission):
-        """Evaluate a submission and return assessment"""
+    def evaluate(self, submission, level='full'):
+        """Evaluate a submission and return assessment
+        
+        level='score' returns only total_score and grade, and level='grade' only the grade.
+        Both skip feedback, and 'grade' stops scoring once the grade can no longer change.
+        """
         try:
             # Get file content
             file_content = submission.get('file_content', '')
             
-            # Evaluate each rubric category
-            breakdown = {}
-            breakdown['logic_design'] = self.evaluate_logic_design(file_content)
-            breakdown['flowchart'] = self.evaluate_flowchart(file_content)
-            breakdown['pseudocode'] = self.evaluate_pseudocode(file_content)
-            breakdown['formatting'] = self.evaluate_formatting(file_content)
-            breakdown['documentation'] = self.evaluate_documentation(file_content)
-            
-            # Calculate total score
-            total_score = Assessment.calculate_total_score(breakdown)
-            grade = Assessment.get_grade(total_score)
+            key = self.content_key(file_content)
+            with self.cache_lock:
+                assessment = self.cache.get(key)
+            if assessment is None:
+                if level != 'full':
+                    # Partial results are not cached; a full evaluation later stores the real one
+                    return self.evaluate_content(file_content, level)
+                assessment = self.evaluate_content(file_content)
+                with self.cache_lock:
+                    self.cache[key] = assessment
             
-            # Generate feedback
-            feedback = self.generate_feedback(breakdown, total_score)
-            
-            return {
-                'breakdown': breakdown,
-                'total_score': total_score,
-                'grade': grade,
-                'feedback': feedback,
-                'strengths': feedback['strengths'],
-                'improvements': feedback['improvements'],
-                'recommendations': feedback['recommendations']
-            }
+            if level != 'full':
+                return self.summarize(assessment, level)
+            # Callers add to and mutate assessments, so never hand out the cached one
+            return copy.deepcopy(assessment)
             
         except Exception as e:
             print(f"  ✗ Error during evaluation: {e}")
-            return self.default_assessment()
+            return self.default_assessment() if level == 'full' else self.summarize(self.default_assessment(), level)
+    
+    def evaluate_batch(self, submissions, chunksize=8):
+        """Evaluate many submissions across the shared worker processes
+        
+        Identical contents are evaluated once, and contents already in this evaluator's
+        cache are not sent to the workers. Results come back in submission order.
+        """
+        from services.workers import process_pool, run_evaluation
+        
+        contents = [submission.get('file_content', '') for submission in submissions]
+        # Anything that isn't text gets a key of its own and fails in the worker as evaluate() would
+        keys = [
+            self.content_key(content) if isinstance(content, str) else ('unhashable', index)
+            for index, content in enumerate(contents)
+        ]
+        
+        with self.cache_lock:
+            results = {key: self.cache[key] for key in keys if key in self.cache}
+        
+        pending = {}
+        for key, content in zip(keys, contents):
+            if key not in results:
+                pending.setdefault(key, content)
+        
+        # Workers only need the text, not the whole submission document
+        assessments = process_pool.map(
+            run_evaluation, [{'file_content': content} for content in pending.values()], chunksize=chunksize
+        )
+        for key, assessment in zip(pending, assessments):
+            results[key] = assessment
+            if isinstance(key, bytes) and assessment['breakdown']:  # don't keep failed evaluations
+                with self.cache_lock:
+                    self.cache[key] = assessment
+        
+        return [copy.deepcopy(results[key]) for key in keys]
+    
+    @staticmethod
+    def content_key(file_content):
+        """Cache key for submission text"""
+        return hashlib.blake2b(file_content.encode(), digest_size=16).digest()
+    
+    def evaluate_content(self, file_content, level='full'):
+        """Score submission text against every rubric category"""
+        # Lowercase, split and count the content once for all categories
+        stats = ContentStats.from_content(file_content)
+        
+        if level == 'grade':
+            return {'grade': self.evaluate_grade(file_content, stats)}
+        
+        # Evaluate each rubric category
+        results = {category: evaluate(file_content, stats) for category, evaluate in self.category_evaluators.items()}
+        # Stored and returned assessments keep plain dicts
+        breakdown = {category: result.as_dict() for category, result in results.items()}
+        
+        # Calculate total score
+        total_score = Assessment.calculate_total_score(breakdown)
+        grade = Assessment.get_grade(total_score)
+        
+        if level == 'score':
+            return {'total_score': total_score, 'grade': grade}
+        
+        # Generate feedback
+        feedback = self.generate_feedback(results, total_score)
+        
+        return {
+            'breakdown': breakdown,
+            'total_score': total_score,
+            'grade': grade,
+            'feedback': feedback,
+            'strengths': feedback['strengths'],
+            'improvements': feedback['improvements'],
+            'recommendations': feedback['recommendations']
+        }
+    
+    def evaluate_grade(self, file_content, stats):
+        """Letter grade, scoring only as many categories as it takes to settle it"""
+        # Heaviest categories first, so the range of reachable totals narrows fastest
+        order = sorted(self.category_evaluators, key=lambda category: self.rubric[category]['weight'], reverse=True)
+        remaining = sum(self.rubric[category]['weight'] for category in order)
+        
+        total = 0
+        for category in order:
+            total += self.category_evaluators[category](file_content, stats).score
+            remaining -= self.rubric[category]['weight']
+            
+            # Grades only rise with the score, so equal grades at both ends settle it
+            grade = Assessment.get_grade(round(total, 2))
+            if grade == Assessment.get_grade(round(total + remaining, 2)):
+                return grade
+    
+    @staticmethod
+    def summarize(assessment, level):
+        """Reduce a full assessment to the fields a partial level returns"""
+        if level == 'grade':
+            return {'grade': assessment['grade']}
+        return {'total_score': assessment['total_score'], 'grade': assessment['grade']}
     
-    def evaluate_logic_design(self, content):
+    def evaluate_logic_design(self, content, stats=None):
         """Evaluate logic design (30%)"""
         weight = self.rubric['logic_design']['weight']
         score = 0
         feedback = []
         
-        # Check for minimum content quality
-        words = [w for w in content.split() if len(w) > 2 and not w.isdigit()]
-        unique_words = set(word.lower() for word in words)
-        lines = [l for l in content.split('\n') if l.strip()]
+        # Computed here only when called outside evaluate()
+        stats = stats or ContentStats.from_content(content)
+        found = stats.keywords
         
         # Reject only completely garbage/minimal content (lowered thresholds for images)
-        if (len(content.strip()) < 50 or 
-            len(words) < 10 or 
-            len(unique_words) < 5 or 
-            len(lines) < 2):
+        if (stats.stripped_length < 50 or 
+            stats.meaningful_words < 10 or 
+            stats.unique_words < 5 or 
+            stats.non_empty_lines < 2):
             feedback.append("Insufficient meaningful content - needs at least 10+ words, 5+ unique words, 2+ lines")
-            return {
-                'score': 0,
-                'max_score': weight,
-                'percentage': 0,
-                'feedback': feedback
-            }
+            return CategoryResult(0, weight, 0, feedback)
         
         # Check for problem understanding keywords
-        problem_keywords = ['problem', 'objective', 'goal', 'requirement', 'input', 'output', 'task', 'assignment', 'question', 'need', 'ask']
-        problem_score = sum(1 for keyword in problem_keywords if keyword.lower() in content.lower())
+        problem_score = len(found & PROBLEM_KEYWORDS)
         if problem_score >= 1:
             score += min(problem_score * 3, 12)
             feedback.append("Problem understanding demonstrated")
         
         # Check for solution elements
-        solution_keywords = ['algorithm', 'solution', 'approach', 'method', 'process', 'steps', 'procedure', 'way', 'how']
-        solution_score = sum(1 for keyword in solution_keywords if keyword.lower() in content.lower())
+        solution_score = len(found & SOLUTION_KEYWORDS)
         if solution_score >= 1:
             score += min(solution_score * 3, 10)
             feedback.append("Solution approach identified")
         
         # Check for logical flow
-        if 'if' in content.lower() or 'else' in content.lower() or 'when' in content.lower() or 'case' in content.lower():
+        if found & CONDITIONAL_KEYWORDS:
             score += 8
             feedback.append("Conditional logic present")
         
         # Check for loop constructs
-        loop_keywords = ['while', 'for', 'repeat', 'loop', 'iterate', 'do while', 'until', 'each']
-        if any(keyword in content.lower() for keyword in loop_keywords):
+        if found & LOOP_KEYWORDS:
             score += 8
             feedback.append("Loop structures identified")
         
         # Check for edge cases
-        edge_keywords = ['edge', 'validation', 'error', 'check', 'validate', 'boundary', 'condition', 'test']
-        edge_count = sum(1 for keyword in edge_keywords if keyword.lower() in content.lower())
+        edge_count = len(found & EDGE_KEYWORDS)
         if edge_count >= 1:
             score += min(edge_count * 3, 8)
             feedback.append("Edge case consideration present")
         
         # Check for variables and data handling
-        var_patterns = [r'\b[a-z_][a-z0-9_]*\s*=', r'variable', r'var\s+', r'data', r'value', r'store']
-        if any(re.search(pattern, content, re.IGNORECASE) for pattern in var_patterns):
+        if LOGIC_VAR_RE.search(content):
             score += 5
             feedback.append("Variable usage identified")
         
         # Bonus for having reasonable content length
-        if len(content) > 500:
+        if stats.length > 500:
             score += 8
             feedback.append("Comprehensive content")
-        elif len(content) > 300:
+        elif stats.length > 300:
             score += 5
             feedback.append("Good content depth")
-        elif len(content) > 150:
+        elif stats.length > 150:
             score += 3
             feedback.append("Adequate content")
         
         # Bonus for having multiple lines (shows effort)
-        if len(content.split('\n')) > 10:
+        if len(stats.lines) > 10:
             score += 4
             feedback.append("Well-structured content")
         
         # Normalize to weight
-        final_score = min((score / 62) * weight, weight)
-        
-        return {
-            'score': round(final_score, 2),
-            'max_score': weight,
-            'percentage': round((final_score / weight) * 100, 2),
-            'feedback': feedback if feedback else ['Logic design could be more explicit']
-        }
+        return category_result(score, 62, weight, feedback or ['Logic design could be more explicit'])
     
-    def evaluate_flowchart(self, content):
+    def evaluate_flowchart(self, content, stats=None):
         """Evaluate flowchart (25%)"""
         weight = self.rubric['flowchart']['weight']
         score = 0
         feedback = []
         
+        stats = stats or ContentStats.from_content(content)
+        found = stats.keywords
+        
         # Check for minimum content quality
-        words = [w for w in content.split() if len(w) > 2 and not w.isdigit()]
-        if len(words) < 30:
+        if stats.meaningful_words < 30:
             feedback.append("Insufficient content - needs at least 30+ meaningful words")
-            return {
-                'score': 0,
-                'max_score': weight,
-                'percentage': 0,
-                'feedback': feedback
-            }
+            return CategoryResult(0, weight, 0, feedback)
         
         # Check for flowchart indicators (be more flexible)
-        flowchart_keywords = ['flowchart', 'flow chart', 'diagram', 'flow', 'chart', 'visual', 'graph', 'figure']
-        flowchart_score = sum(1 for keyword in flowchart_keywords if keyword.lower() in content.lower())
+        flowchart_score = len(found & FLOWCHART_KEYWORDS)
         if flowchart_score >= 1:
             score += min(flowchart_score * 3, 8)
             feedback.append("Flowchart/diagram present")
         
         # Check for flowchart symbols
-        symbols = ['start', 'end', 'process', 'decision', 'input', 'output', 'step', 'box', 'action']
-        symbol_score = sum(1 for symbol in symbols if symbol.lower() in content.lower())
+        symbol_score = len(found & FLOWCHART_SYMBOLS)
         
         if symbol_score >= 3:
             score += 12
@@ -174,83 +398,69 @@ class AssignmentEvaluator:
             feedback.append("Some flowchart elements present")
         
         # Check for flow direction
-        if 'arrow' in content.lower() or '->' in content or '=>' in content or 'direction' in content.lower() or 'next' in content.lower():
+        if 'arrow' in found or '->' in content or '=>' in content or 'direction' in found or 'next' in found:
             score += 5
             feedback.append("Flow direction indicated")
         
         # Check for proper structure
-        if 'start' in content.lower() or 'begin' in content.lower():
+        if 'start' in found or 'begin' in found:
             score += 4
             feedback.append("Has starting point")
         
-        if 'end' in content.lower() or 'stop' in content.lower():
+        if 'end' in found or 'stop' in found:
             score += 3
             feedback.append("Has ending point")
         
         # Bonus for any visual/diagram content
-        visual_keywords = ['show', 'display', 'illustrate', 'represent', 'draw']
-        if any(keyword in content.lower() for keyword in visual_keywords):
+        if found & VISUAL_KEYWORDS:
             score += 5
             feedback.append("Visual representation described")
         
         # Bonus for reasonable length
-        if len(content) > 200:
+        if stats.length > 200:
             score += 4
         
         # Normalize to weight
-        final_score = min((score / 41) * weight, weight)
-        
-        return {
-            'score': round(final_score, 2),
-            'max_score': weight,
-            'percentage': round((final_score / weight) * 100, 2),
-            'feedback': feedback if feedback else ['Include clear flowchart with proper symbols']
-        }
+        return category_result(score, 41, weight, feedback or ['Include clear flowchart with proper symbols'])
     
-    def evaluate_pseudocode(self, content):
+    def evaluate_pseudocode(self, content, stats=None):
         """Evaluate pseudocode (25%)"""
         weight = self.rubric['pseudocode']['weight']
         score = 0
         feedback = []
         
+        stats = stats or ContentStats.from_content(content)
+        found = stats.keywords
+        
         # Check for minimum content quality
-        words = [w for w in content.split() if len(w) > 2 and not w.isdigit()]
-        if len(words) < 30:
+        if stats.meaningful_words < 30:
             feedback.append("Insufficient content - needs at least 30+ meaningful words")
-            return {
-                'score': 0,
-                'max_score': weight,
-                'percentage': 0,
-                'feedback': feedback
-            }
+            return CategoryResult(0, weight, 0, feedback)
         
         # Check for pseudocode indicators (be more flexible)
-        pseudo_keywords = ['pseudocode', 'pseudo code', 'pseudo', 'code', 'algorithm', 'logic', 'program']
-        has_pseudo = any(keyword in content.lower() for keyword in pseudo_keywords)
+        has_pseudo = not found.isdisjoint(PSEUDO_KEYWORDS)
         
         if has_pseudo:
             score += 6
             feedback.append("Pseudocode section identified")
         
         # Check for structure
-        if ('begin' in content.lower() or 'start' in content.lower()) and 'end' in content.lower():
+        if ('begin' in found or 'start' in found) and 'end' in found:
             score += 8
             feedback.append("Proper pseudocode structure")
-        elif 'begin' in content.lower() or 'start' in content.lower() or 'end' in content.lower():
+        elif 'begin' in found or 'start' in found or 'end' in found:
             score += 4
             feedback.append("Has structure keywords")
         
         # Check for variables
-        var_patterns = [r'\b[a-z_][a-z0-9_]*\s*=', r'variable', r'set\s+', r'let\s+', r'get\s+']
-        var_matches = sum(1 for pattern in var_patterns for _ in re.finditer(pattern, content, re.IGNORECASE))
+        var_matches = sum(1 for pattern in PSEUDO_VAR_PATTERNS for _ in pattern.finditer(content))
         if var_matches >= 1:
             score += min(var_matches * 3, 8)
             feedback.append("Variable usage present")
         
         # Check for indentation (proxy for structure)
-        lines = content.split('\n')
-        indented_lines = sum(1 for line in lines if line.startswith('    ') or line.startswith('\t'))
-        total_lines = len([l for l in lines if l.strip()])
+        indented_lines = stats.indented_lines
+        total_lines = stats.non_empty_lines
         
         if total_lines > 3 and indented_lines >= 1:
             score += 6
@@ -259,8 +469,7 @@ class AssignmentEvaluator:
             score += 3
         
         # Check for control structures
-        control_keywords = ['if', 'then', 'else', 'while', 'for', 'repeat', 'loop', 'do', 'when']
-        control_count = sum(1 for keyword in control_keywords if keyword.lower() in content.lower())
+        control_count = len(found & CONTROL_KEYWORDS)
         if control_count >= 1:
             score += min(control_count * 3, 8)
             feedback.append("Control structures included")
@@ -271,44 +480,28 @@ class AssignmentEvaluator:
             feedback.append("Adequate code length")
         
         # Bonus for any logical thinking shown
-        thinking_keywords = ['calculate', 'compute', 'determine', 'find', 'get', 'set', 'update']
-        if any(keyword in content.lower() for keyword in thinking_keywords):
+        if found & THINKING_KEYWORDS:
             score += 5
             feedback.append("Logical operations present")
         
         # Normalize to weight
-        final_score = min((score / 44) * weight, weight)
-        
-        return {
-            'score': round(final_score, 2),
-            'max_score': weight,
-            'percentage': round((final_score / weight) * 100, 2),
-            'feedback': feedback if feedback else ['Improve pseudocode clarity and structure']
-        }
+        return category_result(score, 44, weight, feedback or ['Improve pseudocode clarity and structure'])
     
-    def evaluate_formatting(self, content):
+    def evaluate_formatting(self, content, stats=None):
         """Evaluate formatting (10%)"""
         weight = self.rubric['formatting']['weight']
         score = 0
         feedback = []
         
-        lines = content.split('\n')
-        words = content.split()
+        stats = stats or ContentStats.from_content(content)
         
         # Check for minimum content quality
-        real_words = [w for w in words if len(w) > 2 and not w.isdigit()]
-        if len(content.strip()) < 200 or len(real_words) < 40:
+        if stats.stripped_length < 200 or stats.meaningful_words < 40:
             feedback.append("Insufficient content length - needs at least 40+ meaningful words")
-            return {
-                'score': 0,
-                'max_score': weight,
-                'percentage': 0,
-                'feedback': feedback
-            }
+            return CategoryResult(0, weight, 0, feedback)
         
         # Check for sections/headers
-        header_patterns = [r'^[A-Z][A-Za-z\s]+:', r'^#+\s+', r'^\d+\.', r'^[A-Z][A-Za-z\s]{3,}$']
-        headers = sum(1 for line in lines if any(re.match(pattern, line) for pattern in header_patterns))
+        headers = sum(1 for _ in HEADER_RE.finditer(content))
         
         if headers >= 2:
             score += 4
@@ -318,23 +511,22 @@ class AssignmentEvaluator:
             feedback.append("Some organization present")
         
         # Check for consistent formatting
-        empty_lines = sum(1 for line in lines if line.strip() == '')
-        non_empty = len([l for l in lines if l.strip()])
+        non_empty = stats.non_empty_lines
         
         if non_empty > 3:
             score += 3
             feedback.append("Good content structure")
         
         # Check for adequate content length
-        if len(content) > 300:
+        if stats.length > 300:
             score += 4
             feedback.append("Good content length")
-        elif len(content) > 150:
+        elif stats.length > 150:
             score += 3
             feedback.append("Adequate content length")
         
         # Check for professional appearance
-        if not re.search(r'[a-z]{80,}', content):
+        if not LONG_RUN_RE.search(content):
             score += 3
             feedback.append("Professional appearance")
         
@@ -344,73 +536,54 @@ class AssignmentEvaluator:
             feedback.append("Shows adequate effort")
         
         # Normalize to weight
-        final_score = min((score / 17) * weight, weight)
-        
-        return {
-            'score': round(final_score, 2),
-            'max_score': weight,
-            'percentage': round((final_score / weight) * 100, 2),
-            'feedback': feedback if feedback else ['Improve document organization']
-        }
+        return category_result(score, 17, weight, feedback or ['Improve document organization'])
     
-    def evaluate_documentation(self, content):
+    def evaluate_documentation(self, content, stats=None):
         """Evaluate documentation (10%)"""
         weight = self.rubric['documentation']['weight']
         score = 0
         feedback = []
         
+        stats = stats or ContentStats.from_content(content)
+        found = stats.keywords
+        
         # Check for minimum content quality
-        words = [w for w in content.split() if len(w) > 2 and not w.isdigit()]
-        if len(words) < 30:
+        if stats.meaningful_words < 30:
             feedback.append("Insufficient content for documentation - needs at least 30+ meaningful words")
-            return {
-                'score': 0,
-                'max_score': weight,
-                'percentage': 0,
-                'feedback': feedback
-            }
+            return CategoryResult(0, weight, 0, feedback)
         
         # Check for comments
-        comment_indicators = ['//', '/*', '#', 'comment', 'note', 'remarks', 'explanation', 'describe']
-        comment_score = sum(1 for indicator in comment_indicators if indicator.lower() in content.lower())
+        comment_score = len(found & COMMENT_INDICATORS)
         
         if comment_score >= 1:
             score += min(comment_score * 3, 6)
             feedback.append("Comments/documentation present")
         
         # Check for explanations
-        explanation_keywords = ['explain', 'description', 'purpose', 'because', 'this will', 'in order to', 'to', 'function', 'used for', 'how', 'why', 'what']
-        explain_score = sum(1 for keyword in explanation_keywords if keyword.lower() in content.lower())
+        explain_score = len(found & EXPLANATION_KEYWORDS)
         
         if explain_score >= 1:
             score += min(explain_score * 2, 6)
             feedback.append("Explanations provided")
         
         # Bonus for any descriptive text
-        if len(content) > 200:
+        if stats.length > 200:
             score += 4
             feedback.append("Good documentation length")
         
         # Normalize to weight
-        final_score = min((score / 16) * weight, weight)
-        
-        return {
-            'score': round(final_score, 2),
-            'max_score': weight,
-            'percentage': round((final_score / weight) * 100, 2),
-            'feedback': feedback if feedback else ['Add more comments and explanations']
-        }
+        return category_result(score, 16, weight, feedback or ['Add more comments and explanations'])
     
-    def generate_feedback(self, breakdown, total_score):
-        """Generate overall feedback based on assessment"""
+    def generate_feedback(self, results, total_score):
+        """Generate overall feedback from the CategoryResult of each category"""
         strengths = []
         improvements = []
         recommendations = []
         
         # Analyze each category
-        for category, data in breakdown.items():
-            percentage = data['percentage']
-            category_name = category.replace('_', ' ').title()
+        for category, result in results.items():
+            percentage = result.percentage
+            category_name = CATEGORY_NAMES[category]
             
             if percentage >= 80:
                 strengths.append(f"Strong {category_name} ({percentage}%)")
@@ -428,16 +601,16 @@ class AssignmentEvaluator:
             recommendations.append("Needs significant improvement. Seek help and review course materials.")
         
         # Add specific recommendations
-        if breakdown['logic_design']['percentage'] < 70:
+        if results['logic_design'].percentage < 70:
             recommendations.append("Improve problem-solving approach and algorithm design.")
         
-        if breakdown['flowchart']['percentage'] < 70:
+        if results['flowchart'].percentage < 70:
             recommendations.append("Include detailed flowcharts with proper symbols.")
         
-        if breakdown['pseudocode']['percentage'] < 70:
+        if results['pseudocode'].percentage < 70:
             recommendations.append("Write clearer pseudocode with proper structure.")
         
-        if breakdown['documentation']['percentage'] < 70:
+        if results['documentation'].percentage < 70:
             recommendations.append("Add more comments and explanations to your work.")
         
         return {
@@ -3,8 +3,14 @@ Data extraction service
 Extracts student information from document content
 """
 import re
+import hashlib
+import threading
+from itertools import islice
+from cachetools import LRUCache
 from PyPDF2 import PdfReader
 from docx import Document
+from docx.oxml.ns import qn, nsmap
+from lxml import etree
 import io
 
 try:
@@ -17,10 +23,63 @@ except ImportError:
     TESSERACT_AVAILABLE = False
     print("⚠ Tesseract OCR not available. Install pytesseract and Pillow for image support.")
 
+try:
+    # PDFium parses text in native code; PyPDF2 remains the fallback
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
+
 from config import Config
 
+# Fallback name patterns: a capitalised name following a common keyword, compiled once at import
+NAME_KEYWORD_PATTERNS = tuple(
+    re.compile(rf'{keyword}\s*[:\-]?\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)', re.IGNORECASE)
+    for keyword in ('name', 'student', 'by', 'author', 'prepared by')
+)
+
+# Run content that python-docx's Paragraph.text turns into text, selected in document order
+RUN_CONTENT = '*[self::w:t or self::w:tab or self::w:br or self::w:cr or self::w:noBreakHyphen or self::w:ptab]'
+PARAGRAPH_CONTENT = etree.XPath(f'./w:r/{RUN_CONTENT} | ./w:hyperlink/w:r/{RUN_CONTENT}', namespaces={'w': nsmap['w']})
+W_P, W_T, W_TAB, W_PTAB, W_CR, W_NO_BREAK_HYPHEN = (qn(tag) for tag in ('w:p', 'w:t', 'w:tab', 'w:ptab', 'w:cr', 'w:noBreakHyphen'))
+W_TYPE = qn('w:type')
+
+def paragraph_text(p):
+    """Same text as python-docx's Paragraph.text, read straight from the w:p element"""
+    parts = []
+    for element in PARAGRAPH_CONTENT(p):
+        tag = element.tag
+        if tag == W_T:
+            parts.append(element.text or '')
+        elif tag == W_TAB or tag == W_PTAB:
+            parts.append('\t')
+        elif tag == W_CR:
+            parts.append('\n')
+        elif tag == W_NO_BREAK_HYPHEN:
+            parts.append('-')
+        elif element.get(W_TYPE, 'textWrapping') == 'textWrapping':
+            # w:br; page and column breaks add no text
+            parts.append('\n')
+    return ''.join(parts)
+
 class DataExtractor:
-    """Extract student data from various file formats"""
+    """Extract student data from various file formats
+    
+    File content can be passed as bytes or as a seekable binary file object.
+    """
+    
+    def __init__(self):
+        # Parsed student info keyed by text digest
+        self.info_cache = LRUCache(maxsize=512)
+        self.cache_lock = threading.Lock()
+    
+    @staticmethod
+    def as_stream(file_content):
+        """Return file content as a binary stream positioned at the start"""
+        if isinstance(file_content, (bytes, bytearray)):
+            return io.BytesIO(file_content)
+        file_content.seek(0)
+        return file_content
     
     def extract_from_content(self, file_content, filename):
         """Extract student info from file content"""
@@ -33,7 +92,7 @@ class DataExtractor:
             elif file_ext in ['docx', 'doc']:
                 text = self.extract_from_docx(file_content)
             elif file_ext == 'txt':
-                text = file_content.decode('utf-8', errors='ignore')
+                text = self.as_stream(file_content).read().decode('utf-8', errors='ignore')
             elif file_ext in ['png', 'jpg', 'jpeg']:
                 text = self.extract_from_image(file_content)
             
@@ -44,19 +103,37 @@ class DataExtractor:
             print(f"  ⚠ Error extracting from content: {e}")
             return {'student_id': None, 'student_name': None}
     
+    def pdf_page_texts(self, pdf_content, max_pages=None):
+        """Text of each page of a PDF, up to max_pages"""
+        if not PDFIUM_AVAILABLE:
+            reader = PdfReader(self.as_stream(pdf_content))
+            return [page.extract_text() for page in reader.pages[:max_pages]]
+        
+        # PDFium is not thread-safe, so pages are read in order; files are spread across worker processes instead
+        pdf = pdfium.PdfDocument(self.as_stream(pdf_content))
+        try:
+            texts = []
+            for index in range(len(pdf) if max_pages is None else min(max_pages, len(pdf))):
+                page = pdf[index]
+                textpage = page.get_textpage()
+                texts.append(textpage.get_text_range().replace('\r\n', '\n'))
+                textpage.close()
+                page.close()
+            return texts
+        finally:
+            pdf.close()
+    
+    def docx_paragraph_texts(self, docx_content, max_paragraphs=None):
+        """Text of each top-level paragraph of a DOCX, up to max_paragraphs"""
+        # Walking the XML skips python-docx's per-paragraph and per-run proxy objects
+        body = Document(self.as_stream(docx_content)).element.body
+        return [paragraph_text(p) for p in islice(body.iterchildren(W_P), max_paragraphs)]
+    
     def extract_from_pdf(self, pdf_content):
         """Extract text from PDF"""
         try:
-            pdf_file = io.BytesIO(pdf_content)
-            reader = PdfReader(pdf_file)
-            
-            text = ""
             # Read first 3 pages (usually contains student info)
-            for page_num in range(min(3, len(reader.pages))):
-                page = reader.pages[page_num]
-                text += page.extract_text() + "\n"
-            
-            return text
+            return ''.join(text + "\n" for text in self.pdf_page_texts(pdf_content, max_pages=3))
             
         except Exception as e:
             print(f"  ⚠ Error reading PDF: {e}")
@@ -65,15 +142,8 @@ class DataExtractor:
     def extract_from_docx(self, docx_content):
         """Extract text from DOCX"""
         try:
-            docx_file = io.BytesIO(docx_content)
-            doc = Document(docx_file)
-            
-            text = ""
             # Read first 10 paragraphs (usually contains student info)
-            for para in doc.paragraphs[:10]:
-                text += para.text + "\n"
-            
-            return text
+            return ''.join(text + "\n" for text in self.docx_paragraph_texts(docx_content, max_paragraphs=10))
             
         except Exception as e:
             print(f"  ⚠ Error reading DOCX: {e}")
@@ -86,8 +156,7 @@ class DataExtractor:
             return ""
         
         try:
-            image_file = io.BytesIO(image_content)
-            image = Image.open(image_file)
+            image = Image.open(self.as_stream(image_content))
             
             # Convert RGBA to RGB if needed
             if image.mode == 'RGBA':
@@ -111,29 +180,44 @@ class DataExtractor:
     
     def parse_student_info(self, text):
         """Parse student ID and name from text"""
+        key = hashlib.blake2b(text.encode(), digest_size=16).digest()
+        with self.cache_lock:
+            info = self.info_cache.get(key)
+        if info is None:
+            info = self.match_student_info(text)
+            with self.cache_lock:
+                self.info_cache[key] = info
+        
+        # Copy so a caller's changes never reach the cached entry
+        return dict(info)
+    
+    def match_student_info(self, text):
+        """Run the ID and name patterns over text
+        
+        Patterns are tried one at a time because order is priority: the first pattern
+        with any hit wins, not the leftmost hit across all of them.
+        """
         student_id = None
         student_name = None
         
         # Extract student ID using patterns
         for pattern in Config.STUDENT_ID_PATTERNS:
-            match = re.search(pattern, text)
+            match = pattern.search(text)
             if match:
                 student_id = match.group(0)
                 break
         
         # Extract student name using patterns
         for pattern in Config.NAME_PATTERNS:
-            match = re.search(pattern, text, re.IGNORECASE)
+            match = pattern.search(text)
             if match:
                 student_name = match.group(1).strip()
                 break
         
         # If no pattern match, try to find name after common keywords
         if not student_name:
-            keywords = ['name', 'student', 'by', 'author', 'prepared by']
-            for keyword in keywords:
-                pattern = rf'{keyword}\s*[:\-]?\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)'
-                match = re.search(pattern, text, re.IGNORECASE)
+            for pattern in NAME_KEYWORD_PATTERNS:
+                match = pattern.search(text)
                 if match:
                     student_name = match.group(1).strip()
                     break
@@ -153,7 +237,7 @@ class DataExtractor:
             elif file_ext in ['docx', 'doc']:
                 return self.extract_full_docx(file_content)
             elif file_ext == 'txt':
-                return file_content.decode('utf-8', errors='ignore')
+                return self.as_stream(file_content).read().decode('utf-8', errors='ignore')
             elif file_ext in ['png', 'jpg', 'jpeg']:
                 return self.extract_from_image(file_content)
             
@@ -163,17 +247,37 @@ class DataExtractor:
             print(f"  ⚠ Error extracting assignment content: {e}")
             return ""
     
-    def extract_full_pdf(self, pdf_content):
-        """Extract all text from PDF"""
+    def extract_header_and_content(self, file_content, filename):
+        """Extract (header text, full text), parsing the file only once
+        
+        The header is the same leading part extract_from_content() reads for student info.
+        """
         try:
-            pdf_file = io.BytesIO(pdf_content)
-            reader = PdfReader(pdf_file)
+            file_ext = filename.lower().split('.')[-1]
             
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
+            if file_ext == 'pdf':
+                pages = self.pdf_page_texts(file_content)
+                return ''.join(text + "\n" for text in pages[:3]), ''.join(text + "\n" for text in pages)
+            elif file_ext in ['docx', 'doc']:
+                paragraphs = self.docx_paragraph_texts(file_content)
+                return ''.join(text + "\n" for text in paragraphs[:10]), ''.join(text + "\n" for text in paragraphs)
+            elif file_ext == 'txt':
+                text = self.as_stream(file_content).read().decode('utf-8', errors='ignore')
+                return text, text
+            elif file_ext in ['png', 'jpg', 'jpeg']:
+                text = self.extract_from_image(file_content)
+                return text, text
             
-            return text
+            return "", ""
+            
+        except Exception as e:
+            print(f"  ⚠ Error extracting assignment content: {e}")
+            return "", ""
+    
+    def extract_full_pdf(self, pdf_content):
+        """Extract all text from PDF"""
+        try:
+            return ''.join(text + "\n" for text in self.pdf_page_texts(pdf_content))
             
         except Exception as e:
             return ""
@@ -181,14 +285,7 @@ class DataExtractor:
     def extract_full_docx(self, docx_content):
         """Extract all text from DOCX"""
         try:
-            docx_file = io.BytesIO(docx_content)
-            doc = Document(docx_file)
-            
-            text = ""
-            for para in doc.paragraphs:
-                text += para.text + "\n"
-            
-            return text
+            return ''.join(text + "\n" for text in self.docx_paragraph_texts(docx_content))
             
         except Exception as e:
             return ""
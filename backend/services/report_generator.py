@@ -3,9 +3,15 @@ Report generation service
 Generates assessment reports in various formats
 """
 import os
+import io
+import tempfile
 from datetime import datetime
+from itertools import repeat
+from operator import itemgetter
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.utils import get_column_letter
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
@@ -14,6 +20,134 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 
 from config import Config
+from utils.helpers import format_date
+
+# Spreadsheet styles, built once and shared by every export
+HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+HEADER_FONT = Font(bold=True, color="FFFFFF", size=12)
+THIN_BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+CENTER = Alignment(horizontal='center', vertical='center')
+TITLE_FONT = Font(bold=True, size=14)
+LABEL_FONT = Font(bold=True)
+
+# One fill per grade band; grades not listed are fails
+PASS_FILL = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+AVERAGE_FILL = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
+WEAK_FILL = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+GRADE_FILLS = {
+    'A+': PASS_FILL, 'A': PASS_FILL, 'A-': PASS_FILL,
+    'B+': AVERAGE_FILL, 'B': AVERAGE_FILL, 'B-': AVERAGE_FILL,
+    'C+': WEAK_FILL, 'C': WEAK_FILL, 'C-': WEAK_FILL, 'D': WEAK_FILL
+}
+FAIL_FILL = PatternFill(start_color="FF0000", end_color="FF0000", fill_type="solid")
+FAIL_FONT = Font(color="FFFFFF", bold=True)
+
+SPREADSHEET_HEADERS = (
+    'Student ID', 'Student Name', 'File Name', 'Submission Date',
+    'Total Score', 'Grade',
+    'Logic Design', 'Flowchart', 'Pseudocode', 'Formatting', 'Documentation',
+    'Status'
+)
+COLUMN_WIDTHS = (15, 20, 30, 15, 12, 8, 12, 12, 12, 12, 15, 12)
+GRADE_COLUMN = SPREADSHEET_HEADERS.index('Grade')
+
+# Breakdown categories in rubric order: spreadsheet columns and report sections follow it
+CATEGORY_KEYS = ('logic_design', 'flowchart', 'pseudocode', 'formatting', 'documentation')
+CATEGORY_LABELS = {key: key.replace('_', ' ').title() for key in CATEGORY_KEYS}
+CATEGORY_HEADINGS = {key: label.upper() for key, label in CATEGORY_LABELS.items()}
+EMPTY = {}  # Shared read-only default for missing nested dicts
+SCORE_FIELDS = itemgetter('score', 'max_score', 'percentage')
+
+def category_scores(data):
+    """(score, max_score, percentage) of a breakdown entry, with 0 for missing fields"""
+    try:
+        # Evaluator output always has all three, so one C-level lookup covers almost every entry
+        return SCORE_FIELDS(data)
+    except KeyError:
+        return data.get('score', 0), data.get('max_score', 0), data.get('percentage', 0)
+
+# PDF report styles, built once; Table.setStyle copies the commands, so tables can share them
+SAMPLE_STYLES = getSampleStyleSheet()
+BODY_STYLE = SAMPLE_STYLES['Normal']
+TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=SAMPLE_STYLES['Heading1'],
+    fontSize=18,
+    textColor=colors.HexColor('#1a5490'),
+    spaceAfter=30,
+    alignment=TA_CENTER,
+    fontName='Helvetica-Bold'
+)
+
+HEADING_STYLE = ParagraphStyle(
+    'CustomHeading',
+    parent=SAMPLE_STYLES['Heading2'],
+    fontSize=14,
+    textColor=colors.HexColor('#2c5aa0'),
+    spaceAfter=12,
+    spaceBefore=12,
+    fontName='Helvetica-Bold'
+)
+
+STUDENT_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#e8f0f8')),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+    ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 8),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+])
+
+# Grade cell background is added per report
+RESULTS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#e8f0f8')),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+    ('TEXTCOLOR', (1, 1), (1, 1), colors.whitesmoke),
+    ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 12),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 8),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+])
+
+# Fixed column widths and header row of the PDF tables
+INFO_COL_WIDTHS = (2*inch, 4*inch)
+BREAKDOWN_COL_WIDTHS = (2.5*inch, 1*inch, 1.2*inch, 1.3*inch)
+BREAKDOWN_HEADER = ('Category', 'Score', 'Max Score', 'Percentage')
+
+BREAKDOWN_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c5aa0')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('ALIGN', (0, 1), (0, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 6),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f5f5f5')])
+])
 
 class ReportGenerator:
     """Generate assessment reports"""
@@ -29,7 +163,14 @@ class ReportGenerator:
             format: 'pdf' or 'txt' (default: 'pdf')
         """
         try:
-            if format.lower() == 'pdf':
+            extension = 'pdf' if format.lower() == 'pdf' else 'txt'
+            
+            # Report names are keyed on the evaluation, so an existing file is still current
+            filepath = os.path.join(self.reports_dir, self.report_filename(submission, extension))
+            if os.path.exists(filepath):
+                return filepath
+            
+            if extension == 'pdf':
                 return self.generate_pdf_report(submission)
             else:
                 return self.generate_text_report(submission)
@@ -37,23 +178,72 @@ class ReportGenerator:
             print(f"  ✗ Error generating report: {e}")
             raise
     
+    def generate_reports_bulk(self, submissions, format='pdf', chunksize=8):
+        """Generate individual reports for many submissions across the shared worker processes
+        
+        Returns report file paths in submission order. Reports already rendered for a
+        submission's current evaluation are reused rather than sent to the workers.
+        """
+        from services.workers import process_pool, run_report
+        
+        extension = 'pdf' if format.lower() == 'pdf' else 'txt'
+        paths = [os.path.join(self.reports_dir, self.report_filename(submission, extension)) for submission in submissions]
+        pending = [index for index, path in enumerate(paths) if not os.path.exists(path)]
+        
+        # The original file is not part of any report, so it is never pickled to the workers
+        documents = [
+            {key: value for key, value in submissions[index].items() if key != 'file_content'}
+            for index in pending
+        ]
+        for index, path in zip(pending, process_pool.map(run_report, documents, repeat(format), chunksize=chunksize)):
+            paths[index] = path
+        
+        print(f"  ✓ {len(pending)} of {len(paths)} reports generated")
+        return paths
+    
+    @staticmethod
+    def write_report_file(filepath, data):
+        """Write a finished report in one call and move it into place atomically
+        
+        Reports are reused whenever the file exists, so a partly written file must never
+        appear under the final name.
+        """
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(filepath), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, filepath)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    
+    @staticmethod
+    def report_version(submission):
+        """Version token for a submission's report, changes on every re-evaluation"""
+        evaluated_at = submission.get('evaluated_at')
+        if isinstance(evaluated_at, datetime):
+            return evaluated_at.strftime('%Y%m%d_%H%M%S_%f')
+        return 'unevaluated'
+    
+    def report_filename(self, submission, extension):
+        """Deterministic report filename for a submission's current evaluation"""
+        student_id = submission.get('student_id', 'UNKNOWN')
+        return f"report_{student_id}_{submission['_id']}_{self.report_version(submission)}.{extension}"
+    
     def generate_text_report(self, submission):
         """Generate individual text report for a submission"""
         try:
-            student_id = submission.get('student_id', 'UNKNOWN')
             assessment = submission.get('assessment', {})
             
             # Create report filename
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"report_{student_id}_{timestamp}.txt"
+            filename = self.report_filename(submission, 'txt')
             filepath = os.path.join(self.reports_dir, filename)
             
             # Generate report content
             report_content = self.format_individual_report(submission, assessment)
             
             # Write to file
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(report_content)
+            self.write_report_file(filepath, report_content.encode('utf-8'))
             
             print(f"  ✓ Text report generated: {filename}")
             return filepath
@@ -64,12 +254,30 @@ class ReportGenerator:
     
     def generate_pdf_report(self, submission):
         """Generate PDF report for a submission"""
+        try:
+            filename = self.report_filename(submission, 'pdf')
+            filepath = os.path.join(self.reports_dir, filename)
+            
+            # Laid out in memory, then written in one go
+            self.write_report_file(filepath, self.generate_pdf_report_bytes(submission))
+            
+            print(f"  ✓ PDF report generated: {filename}")
+            return filepath
+            
+        except Exception as e:
+            print(f"  ✗ Error generating PDF report: {e}")
+            raise
+    
+    def generate_pdf_report_bytes(self, submission):
+        """Render the PDF report for a submission in memory and return its bytes"""
         try:
             student_id = submission.get('student_id', 'UNKNOWN')
             student_name = submission.get('student_name', 'UNKNOWN')
             file_name = submission.get('file_name', 'UNKNOWN')
-            submitted_at = submission.get('submitted_at', datetime.now())
-            evaluated_at = submission.get('evaluated_at', datetime.now())
+            # Missing dates default to the time of rendering
+            now = datetime.now()
+            submitted_at = submission.get('submitted_at', now)
+            evaluated_at = submission.get('evaluated_at', now)
             
             assessment = submission.get('assessment', {})
             total_score = assessment.get('total_score', 0)
@@ -77,128 +285,59 @@ class ReportGenerator:
             breakdown = assessment.get('breakdown', {})
             feedback = assessment.get('feedback', {})
             
-            # Create PDF filename
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"report_{student_id}_{timestamp}.pdf"
-            filepath = os.path.join(self.reports_dir, filename)
-            
             # Create PDF
-            doc = SimpleDocTemplate(filepath, pagesize=letter,
+            buffer = io.BytesIO()
+            doc = SimpleDocTemplate(buffer, pagesize=letter,
                                    rightMargin=72, leftMargin=72,
                                    topMargin=72, bottomMargin=18)
             
             # Container for elements
             elements = []
             
-            # Styles
-            styles = getSampleStyleSheet()
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=18,
-                textColor=colors.HexColor('#1a5490'),
-                spaceAfter=30,
-                alignment=TA_CENTER,
-                fontName='Helvetica-Bold'
-            )
-            
-            heading_style = ParagraphStyle(
-                'CustomHeading',
-                parent=styles['Heading2'],
-                fontSize=14,
-                textColor=colors.HexColor('#2c5aa0'),
-                spaceAfter=12,
-                spaceBefore=12,
-                fontName='Helvetica-Bold'
-            )
-            
             # Title
-            elements.append(Paragraph("PROGRAMMING LOGIC ASSIGNMENT", title_style))
-            elements.append(Paragraph("ASSESSMENT REPORT", title_style))
+            elements.append(Paragraph("PROGRAMMING LOGIC ASSIGNMENT", TITLE_STYLE))
+            elements.append(Paragraph("ASSESSMENT REPORT", TITLE_STYLE))
             elements.append(Spacer(1, 20))
             
             # Student Information
-            elements.append(Paragraph("STUDENT INFORMATION", heading_style))
+            elements.append(Paragraph("STUDENT INFORMATION", HEADING_STYLE))
             student_data = [
                 ['Student ID:', student_id],
                 ['Student Name:', student_name],
                 ['Assignment File:', file_name],
-                ['Submission Date:', submitted_at.strftime('%Y-%m-%d %H:%M:%S') if isinstance(submitted_at, datetime) else str(submitted_at)],
-                ['Evaluation Date:', evaluated_at.strftime('%Y-%m-%d %H:%M:%S') if isinstance(evaluated_at, datetime) else str(evaluated_at)]
+                ['Submission Date:', format_date(submitted_at)],
+                ['Evaluation Date:', format_date(evaluated_at)]
             ]
-            student_table = Table(student_data, colWidths=[2*inch, 4*inch])
-            student_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#e8f0f8')),
-                ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-                ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 8),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-                ('TOPPADDING', (0, 0), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ]))
+            student_table = Table(student_data, colWidths=INFO_COL_WIDTHS)
+            student_table.setStyle(STUDENT_TABLE_STYLE)
             elements.append(student_table)
             elements.append(Spacer(1, 20))
             
             # Assessment Results
-            elements.append(Paragraph("ASSESSMENT RESULTS", heading_style))
+            elements.append(Paragraph("ASSESSMENT RESULTS", HEADING_STYLE))
             grade_color = colors.green if total_score >= 70 else colors.orange if total_score >= 50 else colors.red
             results_data = [
                 ['Overall Score:', f"{total_score}/100"],
                 ['Grade:', grade]
             ]
-            results_table = Table(results_data, colWidths=[2*inch, 4*inch])
-            results_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#e8f0f8')),
-                ('BACKGROUND', (1, 1), (1, 1), grade_color),
-                ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-                ('TEXTCOLOR', (1, 1), (1, 1), colors.whitesmoke),
-                ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-                ('ALIGN', (1, 0), (1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTNAME', (1, 0), (1, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 12),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 8),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-                ('TOPPADDING', (0, 0), (-1, -1), 8),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ]))
+            results_table = Table(results_data, colWidths=INFO_COL_WIDTHS)
+            results_table.setStyle(RESULTS_TABLE_STYLE)
+            # Only the grade cell colour depends on the submission
+            results_table.setStyle(TableStyle([('BACKGROUND', (1, 1), (1, 1), grade_color)]))
             elements.append(results_table)
             elements.append(Spacer(1, 20))
             
             # Detailed Breakdown
-            elements.append(Paragraph("DETAILED BREAKDOWN", heading_style))
-            breakdown_data = [['Category', 'Score', 'Max Score', 'Percentage']]
-            for category, data in breakdown.items():
-                category_name = category.replace('_', ' ').title()
-                score = data.get('score', 0)
-                max_score = data.get('max_score', 0)
-                percentage = data.get('percentage', 0)
-                breakdown_data.append([category_name, f"{score:.1f}", f"{max_score}", f"{percentage:.1f}%"])
-            
-            breakdown_table = Table(breakdown_data, colWidths=[2.5*inch, 1*inch, 1.2*inch, 1.3*inch])
-            breakdown_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c5aa0')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('ALIGN', (0, 1), (0, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 6),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-                ('TOPPADDING', (0, 0), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f5f5f5')])
-            ]))
+            elements.append(Paragraph("DETAILED BREAKDOWN", HEADING_STYLE))
+            breakdown_data = [BREAKDOWN_HEADER]
+            for category in CATEGORY_KEYS:
+                if category not in breakdown:
+                    continue
+                score, max_score, percentage = category_scores(breakdown[category])
+                breakdown_data.append([CATEGORY_LABELS[category], f"{score:.1f}", f"{max_score}", f"{percentage:.1f}%"])
+            
+            breakdown_table = Table(breakdown_data, colWidths=BREAKDOWN_COL_WIDTHS)
+            breakdown_table.setStyle(BREAKDOWN_TABLE_STYLE)
             elements.append(breakdown_table)
             elements.append(Spacer(1, 20))
             
@@ -208,30 +347,28 @@ class ReportGenerator:
             recommendations = assessment.get('recommendations', [])
             
             if strengths:
-                elements.append(Paragraph("STRENGTHS", heading_style))
+                elements.append(Paragraph("STRENGTHS", HEADING_STYLE))
                 for strength in strengths:
-                    elements.append(Paragraph(f"✓ {strength}", styles['Normal']))
+                    elements.append(Paragraph(f"✓ {strength}", BODY_STYLE))
                 elements.append(Spacer(1, 12))
             
             if improvements:
-                elements.append(Paragraph("AREAS FOR IMPROVEMENT", heading_style))
+                elements.append(Paragraph("AREAS FOR IMPROVEMENT", HEADING_STYLE))
                 for improvement in improvements:
-                    elements.append(Paragraph(f"○ {improvement}", styles['Normal']))
+                    elements.append(Paragraph(f"○ {improvement}", BODY_STYLE))
                 elements.append(Spacer(1, 12))
             
             if recommendations:
-                elements.append(Paragraph("RECOMMENDATIONS", heading_style))
+                elements.append(Paragraph("RECOMMENDATIONS", HEADING_STYLE))
                 for recommendation in recommendations:
-                    elements.append(Paragraph(f"→ {recommendation}", styles['Normal']))
+                    elements.append(Paragraph(f"→ {recommendation}", BODY_STYLE))
             
             # Build PDF
             doc.build(elements)
-            
-            print(f"  ✓ PDF report generated: {filename}")
-            return filepath
+            return buffer.getvalue()
             
         except Exception as e:
-            print(f"  ✗ Error generating PDF report: {e}")
+            print(f"  ✗ Error rendering PDF report: {e}")
             raise
     
     def format_individual_report(self, submission, assessment):
@@ -239,15 +376,16 @@ class ReportGenerator:
         student_id = submission.get('student_id', 'UNKNOWN')
         student_name = submission.get('student_name', 'UNKNOWN')
         file_name = submission.get('file_name', 'UNKNOWN')
-        submitted_at = submission.get('submitted_at', datetime.now())
-        evaluated_at = submission.get('evaluated_at', datetime.now())
+        now = datetime.now()
+        submitted_at = submission.get('submitted_at', now)
+        evaluated_at = submission.get('evaluated_at', now)
         
         total_score = assessment.get('total_score', 0)
         grade = assessment.get('grade', 'F')
         breakdown = assessment.get('breakdown', {})
         feedback = assessment.get('feedback', {})
         
-        report = f"""
+        parts = [f"""
 {"="*80}
                     PROGRAMMING LOGIC ASSIGNMENT
                         ASSESSMENT REPORT
@@ -258,8 +396,8 @@ STUDENT INFORMATION
 Student ID       : {student_id}
 Student Name     : {student_name}
 Assignment File  : {file_name}
-Submission Date  : {submitted_at.strftime('%Y-%m-%d %H:%M:%S') if isinstance(submitted_at, datetime) else submitted_at}
-Evaluation Date  : {evaluated_at.strftime('%Y-%m-%d %H:%M:%S') if isinstance(evaluated_at, datetime) else evaluated_at}
+Submission Date  : {format_date(submitted_at)}
+Evaluation Date  : {format_date(evaluated_at)}
 
 {"="*80}
                          ASSESSMENT RESULTS
@@ -270,148 +408,103 @@ OVERALL SCORE: {total_score}/100    GRADE: {grade}
 {"="*80}
                         DETAILED BREAKDOWN
 {"="*80}
-"""
+"""]
         
         # Add breakdown for each category
-        for category, data in breakdown.items():
-            category_name = category.replace('_', ' ').title()
-            score = data.get('score', 0)
-            max_score = data.get('max_score', 0)
-            percentage = data.get('percentage', 0)
+        for category in CATEGORY_KEYS:
+            if category not in breakdown:
+                continue
+            data = breakdown[category]
+            score, max_score, percentage = category_scores(data)
             category_feedback = data.get('feedback', [])
             
-            report += f"\n{category_name.upper()}\n"
-            report += f"{'-'*80}\n"
-            report += f"Score: {score}/{max_score} ({percentage}%)\n"
+            parts.append(f"\n{CATEGORY_HEADINGS[category]}\n")
+            parts.append(f"{'-'*80}\n")
+            parts.append(f"Score: {score}/{max_score} ({percentage}%)\n")
             
             if category_feedback:
-                report += f"Feedback:\n"
-                for item in category_feedback:
-                    report += f"  • {item}\n"
-            report += "\n"
+                parts.append(f"Feedback:\n")
+                parts.extend(f"  • {item}\n" for item in category_feedback)
+            parts.append("\n")
         
         # Add overall feedback
-        report += f"{'='*80}\n"
-        report += f"                      OVERALL FEEDBACK\n"
-        report += f"{'='*80}\n\n"
+        parts.append(f"{'='*80}\n")
+        parts.append(f"                      OVERALL FEEDBACK\n")
+        parts.append(f"{'='*80}\n\n")
         
         strengths = feedback.get('strengths', [])
         improvements = feedback.get('improvements', [])
         recommendations = feedback.get('recommendations', [])
         
         if strengths:
-            report += f"STRENGTHS:\n"
-            for strength in strengths:
-                report += f"  ✓ {strength}\n"
-            report += "\n"
+            parts.append(f"STRENGTHS:\n")
+            parts.extend(f"  ✓ {strength}\n" for strength in strengths)
+            parts.append("\n")
         
         if improvements:
-            report += f"AREAS FOR IMPROVEMENT:\n"
-            for improvement in improvements:
-                report += f"  ○ {improvement}\n"
-            report += "\n"
+            parts.append(f"AREAS FOR IMPROVEMENT:\n")
+            parts.extend(f"  ○ {improvement}\n" for improvement in improvements)
+            parts.append("\n")
         
         if recommendations:
-            report += f"RECOMMENDATIONS:\n"
-            for recommendation in recommendations:
-                report += f"  → {recommendation}\n"
-            report += "\n"
+            parts.append(f"RECOMMENDATIONS:\n")
+            parts.extend(f"  → {recommendation}\n" for recommendation in recommendations)
+            parts.append("\n")
         
-        report += f"{'='*80}\n"
-        report += f"                    END OF REPORT\n"
-        report += f"{'='*80}\n"
+        parts.append(f"{'='*80}\n")
+        parts.append(f"                    END OF REPORT\n")
+        parts.append(f"{'='*80}\n")
         
-        return report
+        return ''.join(parts)
     
     def generate_spreadsheet(self, submissions):
-        """Generate Excel spreadsheet with all assessments"""
+        """Generate Excel spreadsheet with all assessments
+        
+        Args:
+            submissions: Any iterable of submissions (e.g. a MongoDB cursor).
+                Rows are streamed to a write-only workbook as they are read.
+        """
         try:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f"assessments_summary_{timestamp}.xlsx"
             filepath = os.path.join(self.reports_dir, filename)
             
-            # Create workbook
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Assessments"
-            
-            # Define styles
-            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            header_font = Font(bold=True, color="FFFFFF", size=12)
-            border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
+            # Create write-only workbook (rows are flushed as they are appended)
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet("Assessments")
             
-            # Headers
-            headers = [
-                'Student ID', 'Student Name', 'File Name', 'Submission Date',
-                'Total Score', 'Grade', 
-                'Logic Design', 'Flowchart', 'Pseudocode', 'Formatting', 'Documentation',
-                'Status'
-            ]
+            # Adjust column widths (must happen before any rows in write-only mode)
+            for col, width in enumerate(COLUMN_WIDTHS, 1):
+                ws.column_dimensions[get_column_letter(col)].width = width
             
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col, value=header)
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-                cell.border = border
+            # Headers
+            header_row = []
+            for header in SPREADSHEET_HEADERS:
+                cell = WriteOnlyCell(ws, value=header)
+                cell.fill = HEADER_FILL
+                cell.font = HEADER_FONT
+                cell.alignment = CENTER
+                cell.border = THIN_BORDER
+                header_row.append(cell)
+            ws.append(header_row)
+            
+            # Statistics are accumulated while rows stream past
+            summary = {
+                'total': 0,
+                'evaluated': 0,
+                'score_sum': 0,
+                'max_score': None,
+                'min_score': None,
+                'passed': 0
+            }
             
             # Data rows
-            for row_idx, submission in enumerate(submissions, 2):
-                assessment = submission.get('assessment', {})
-                breakdown = assessment.get('breakdown', {})
-                
-                # Extract scores
-                logic_score = breakdown.get('logic_design', {}).get('score', 0)
-                flowchart_score = breakdown.get('flowchart', {}).get('score', 0)
-                pseudocode_score = breakdown.get('pseudocode', {}).get('score', 0)
-                formatting_score = breakdown.get('formatting', {}).get('score', 0)
-                documentation_score = breakdown.get('documentation', {}).get('score', 0)
-                
-                row_data = [
-                    submission.get('student_id', 'N/A'),
-                    submission.get('student_name', 'N/A'),
-                    submission.get('file_name', 'N/A'),
-                    submission.get('submitted_at', datetime.now()).strftime('%Y-%m-%d') if isinstance(submission.get('submitted_at'), datetime) else 'N/A',
-                    assessment.get('total_score', 0),
-                    assessment.get('grade', 'F'),
-                    logic_score,
-                    flowchart_score,
-                    pseudocode_score,
-                    formatting_score,
-                    documentation_score,
-                    submission.get('status', 'N/A')
-                ]
-                
-                for col, value in enumerate(row_data, 1):
-                    cell = ws.cell(row=row_idx, column=col, value=value)
-                    cell.border = border
-                    cell.alignment = Alignment(horizontal='center', vertical='center')
-                    
-                    # Color code grades
-                    if col == 6:  # Grade column
-                        if value in ['A+', 'A', 'A-']:
-                            cell.fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-                        elif value in ['B+', 'B', 'B-']:
-                            cell.fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
-                        elif value in ['C+', 'C', 'C-', 'D']:
-                            cell.fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-                        else:
-                            cell.fill = PatternFill(start_color="FF0000", end_color="FF0000", fill_type="solid")
-                            cell.font = Font(color="FFFFFF", bold=True)
-            
-            # Adjust column widths
-            column_widths = [15, 20, 30, 15, 12, 8, 12, 12, 12, 12, 15, 12]
-            for col, width in enumerate(column_widths, 1):
-                ws.column_dimensions[chr(64 + col)].width = width
+            for row in self.spreadsheet_rows(ws, submissions, summary):
+                ws.append(row)
             
             # Add statistics sheet
             stats_ws = wb.create_sheet("Statistics")
-            self.add_statistics_sheet(stats_ws, submissions)
+            self.add_statistics_sheet(stats_ws, summary)
             
             # Save workbook
             wb.save(filepath)
@@ -423,24 +516,81 @@ OVERALL SCORE: {total_score}/100    GRADE: {grade}
             print(f"  ✗ Error generating spreadsheet: {e}")
             raise
     
-    def add_statistics_sheet(self, ws, submissions):
-        """Add statistics to spreadsheet"""
+    def spreadsheet_rows(self, ws, submissions, summary):
+        """Yield one row of styled cells per submission, updating summary as it goes"""
+        for submission in submissions:
+            assessment = submission.get('assessment', EMPTY)
+            breakdown = assessment.get('breakdown', EMPTY)
+            submitted_at = submission.get('submitted_at')
+            
+            row_data = [
+                submission.get('student_id', 'N/A'),
+                submission.get('student_name', 'N/A'),
+                submission.get('file_name', 'N/A'),
+                submitted_at.strftime('%Y-%m-%d') if isinstance(submitted_at, datetime) else 'N/A',
+                assessment.get('total_score', 0),
+                assessment.get('grade', 'F'),
+                *[breakdown.get(key, EMPTY).get('score', 0) for key in CATEGORY_KEYS],
+                submission.get('status', 'N/A')
+            ]
+            
+            row = []
+            for value in row_data:
+                cell = WriteOnlyCell(ws, value=value)
+                cell.border = THIN_BORDER
+                cell.alignment = CENTER
+                row.append(cell)
+            
+            # Color code grades
+            grade_cell = row[GRADE_COLUMN]
+            fill = GRADE_FILLS.get(grade_cell.value)
+            if fill is None:
+                grade_cell.fill = FAIL_FILL
+                grade_cell.font = FAIL_FONT
+            else:
+                grade_cell.fill = fill
+            yield row
+            
+            summary['total'] += 1
+            if submission.get('status') == 'evaluated':
+                score = assessment.get('total_score', 0)
+                summary['evaluated'] += 1
+                summary['score_sum'] += score
+                if summary['max_score'] is None or score > summary['max_score']:
+                    summary['max_score'] = score
+                if summary['min_score'] is None or score < summary['min_score']:
+                    summary['min_score'] = score
+                if score >= Config.PASS_THRESHOLD:
+                    summary['passed'] += 1
+    
+    def add_statistics_sheet(self, ws, summary):
+        """Add statistics to a write-only spreadsheet sheet
+        
+        Args:
+            ws: Write-only worksheet
+            summary: Totals accumulated by generate_spreadsheet
+        """
         try:
+            # Adjust column widths
+            ws.column_dimensions['A'].width = 20
+            ws.column_dimensions['B'].width = 15
+            
             # Title
-            ws['A1'] = 'ASSESSMENT STATISTICS'
-            ws['A1'].font = Font(bold=True, size=14)
+            title = WriteOnlyCell(ws, value='ASSESSMENT STATISTICS')
+            title.font = TITLE_FONT
+            ws.append([title])
+            ws.append([])
             
             # Calculate statistics
-            total = len(submissions)
-            evaluated = len([s for s in submissions if s.get('status') == 'evaluated'])
+            total = summary['total']
+            evaluated = summary['evaluated']
             
-            scores = [s.get('assessment', {}).get('total_score', 0) for s in submissions if s.get('status') == 'evaluated']
-            avg_score = sum(scores) / len(scores) if scores else 0
-            max_score = max(scores) if scores else 0
-            min_score = min(scores) if scores else 0
+            avg_score = summary['score_sum'] / evaluated if evaluated else 0
+            max_score = summary['max_score'] if summary['max_score'] is not None else 0
+            min_score = summary['min_score'] if summary['min_score'] is not None else 0
             
-            passed = len([s for s in scores if s >= Config.PASS_THRESHOLD])
-            failed = len(scores) - passed
+            passed = summary['passed']
+            failed = evaluated - passed
             
             # Add data
             stats = [
@@ -458,14 +608,10 @@ OVERALL SCORE: {total_score}/100    GRADE: {grade}
                 ('Pass Rate:', f'{(passed/evaluated*100):.2f}%' if evaluated > 0 else '0%')
             ]
             
-            for row, (label, value) in enumerate(stats, 3):
-                ws[f'A{row}'] = label
-                ws[f'B{row}'] = value
-                ws[f'A{row}'].font = Font(bold=True)
-            
-            # Adjust column widths
-            ws.column_dimensions['A'].width = 20
-            ws.column_dimensions['B'].width = 15
+            for label, value in stats:
+                label_cell = WriteOnlyCell(ws, value=label)
+                label_cell.font = LABEL_FONT
+                ws.append([label_cell, value])
             
         except Exception as e:
             print(f"  ⚠ Error adding statistics: {e}")
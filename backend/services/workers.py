@@ -0,0 +1,44 @@
+"""
+Worker process pool for CPU-bound extraction, evaluation and report rendering
+Shared by the API's batch endpoints and the Drive monitor pipeline
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Per-process service instances, built once by the pool initializer
+_extractor = None
+_evaluator = None
+_report_generator = None
+
+def _init_worker():
+    """Create the extractor, evaluator and report generator inside each worker process"""
+    global _extractor, _evaluator, _report_generator
+    from services.extraction import DataExtractor
+    from services.evaluator import AssignmentEvaluator
+    from services.report_generator import ReportGenerator
+    
+    _extractor = DataExtractor()
+    _evaluator = AssignmentEvaluator()
+    _report_generator = ReportGenerator()
+
+def run_extraction(file_content, filename, include_info):
+    """Extract (StudentInfo or None, full text) from file bytes"""
+    from models.student_info import StudentInfo
+    
+    if not include_info:
+        return None, _extractor.extract_assignment_content(file_content, filename)
+    
+    # Student info comes from the leading pages of the same parse, so the file is read once
+    header, text = _extractor.extract_header_and_content(file_content, filename)
+    return StudentInfo(**_extractor.parse_student_info(header)), text
+
+def run_evaluation(submission):
+    """Evaluate a submission document and return its assessment"""
+    return _evaluator.evaluate(submission)
+
+def run_report(submission, report_format):
+    """Render an individual report for a submission and return its file path"""
+    return _report_generator.generate_individual_report(submission, format=report_format)
+
+# Worker processes are spawned on first use
+process_pool = ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=_init_worker)
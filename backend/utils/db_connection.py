@@ -1,9 +1,29 @@
 """
 MongoDB database connection module
 """
-from pymongo import MongoClient
+import os
+import threading
+from pymongo import MongoClient, IndexModel
+from pymongo.errors import OperationFailure
 from config import Config
 
+# Submissions indexes besides the unique file_id one; the compound ones match the
+# filter + (submitted_at, _id) sort of the API queries
+SUBMISSION_INDEXES = [
+    IndexModel('student_id'),
+    IndexModel('status'),
+    IndexModel('submitted_at'),
+    IndexModel('md5_checksum'),
+    IndexModel([('submitted_at', -1), ('_id', -1)]),
+    IndexModel([('status', 1), ('submitted_at', -1), ('_id', -1)]),
+    IndexModel([('student_id', 1), ('submitted_at', -1), ('_id', -1)])
+]
+# monitor_state document whose version counts writes to submissions
+STATS_STATE_ID = 'stats'
+
+# Earlier indexes now covered by a wider one above; dropped when found
+SUPERSEDED_INDEXES = ['status_1_submitted_at_-1', 'student_id_1_submitted_at_-1']
+
 class Database:
     """MongoDB database connection wrapper"""
     
@@ -15,7 +35,16 @@ class Database:
     def connect(self):
         """Establish connection to MongoDB"""
         try:
-            self.client = MongoClient(Config.MONGODB_URI)
+            # Fails fast when the server is unreachable instead of waiting out the 30s default
+            self.client = MongoClient(
+                Config.MONGODB_URI,
+                maxPoolSize=Config.MONGODB_MAX_POOL_SIZE,
+                minPoolSize=Config.MONGODB_MIN_POOL_SIZE,
+                serverSelectionTimeoutMS=Config.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+                socketTimeoutMS=Config.MONGODB_SOCKET_TIMEOUT_MS,
+                retryWrites=True,
+                compressors=Config.MONGODB_COMPRESSORS
+            )
             self.db = self.client[Config.MONGODB_DB_NAME]
             
             # Test connection
@@ -23,7 +52,8 @@ class Database:
             print(f"✓ Connected to MongoDB: {Config.MONGODB_DB_NAME}")
             
             # Create indexes
-            self.create_indexes()
+            if Config.AUTO_CREATE_INDEXES:
+                self.create_indexes()
             
         except Exception as e:
             print(f"✗ MongoDB connection failed: {e}")
@@ -32,16 +62,43 @@ class Database:
     def create_indexes(self):
         """Create database indexes for better performance"""
         try:
-            # Submissions collection indexes
-            self.db.submissions.create_index('student_id')
-            self.db.submissions.create_index('status')
-            self.db.submissions.create_index('submitted_at')
-            self.db.submissions.create_index('file_id')
+            # One listing, then a single createIndexes command for whatever is missing
+            existing = self.db.submissions.index_information()
+            missing = [index for index in SUBMISSION_INDEXES if index.document['name'] not in existing]
+            if missing:
+                self.db.submissions.create_indexes(missing)
+            for name in SUPERSEDED_INDEXES:
+                if name in existing:
+                    self.db.submissions.drop_index(name)
+            
+            self.create_file_id_index(existing)
             
-            print("✓ Database indexes created")
+            print("✓ Database indexes ready")
         except Exception as e:
             print(f"✗ Error creating indexes: {e}")
     
+    def create_file_id_index(self, indexes):
+        """Unique file_id index, which the Drive monitor relies on to deduplicate ingestion"""
+        if 'file_id_1' in indexes:
+            if indexes['file_id_1'].get('unique'):
+                return
+            self.db.submissions.drop_index('file_id_1')
+        
+        try:
+            self.db.submissions.create_index('file_id', unique=True)
+        except OperationFailure as e:
+            print(f"⚠ Could not make file_id unique (duplicate submissions exist?): {e}")
+            self.db.submissions.create_index('file_id')
+    
+    def mark_submissions_changed(self):
+        """Bump the shared submissions version, so cached statistics in every process go stale"""
+        self.db.monitor_state.update_one({'_id': STATS_STATE_ID}, {'$inc': {'version': 1}}, upsert=True)
+    
+    def submissions_version(self):
+        """Current shared submissions version (0 before the first recorded write)"""
+        state = self.db.monitor_state.find_one({'_id': STATS_STATE_ID}, {'version': 1}) or {}
+        return state.get('version', 0)
+    
     @property
     def submissions(self):
         """Get submissions collection"""
@@ -52,11 +109,39 @@ class Database:
         """Get assessments collection"""
         return self.db.assessments
     
+    @property
+    def monitor_state(self):
+        """Get monitor state collection"""
+        return self.db.monitor_state
+    
     def close(self):
         """Close database connection"""
         if self.client:
             self.client.close()
             print("✓ MongoDB connection closed")
 
-# Create global database instance
-db = Database()
+# One Database per process: a MongoClient must not be shared across fork()
+_database = None
+_database_pid = None
+_database_lock = threading.Lock()
+
+def get_db():
+    """Database for the current process, connecting on first use and again after a fork"""
+    global _database, _database_pid
+    pid = os.getpid()
+    if _database is None or _database_pid != pid:
+        with _database_lock:
+            if _database is None or _database_pid != pid:
+                # The parent's client is dropped, not closed, so its sockets stay usable in the parent
+                _database = Database()
+                _database_pid = pid
+    return _database
+
+class DatabaseProxy:
+    """Module-level handle that resolves to the current process's Database on every access"""
+    
+    def __getattr__(self, name):
+        return getattr(get_db(), name)
+
+# Global database handle; connects lazily in whichever process first uses it
+db = DatabaseProxy()
@@ -4,10 +4,18 @@ Utility helper functions
 import re
 import os
 from datetime import datetime
+from functools import lru_cache
+
+# Filename patterns, compiled once at import
+INVALID_FILENAME_CHARS_RE = re.compile(r'[<>:"/\\|?*]')
+NAME_DELIMITER_RE = re.compile(r'[_\-]+')
+NAME_LETTERS_RE = re.compile(r'[A-Za-z]{2,}')
 
 def extract_file_extension(filename):
     """Extract file extension from filename"""
-    return os.path.splitext(filename)[1].lower()
+    # Only the suffix is needed, so skip os.path.splitext's path handling
+    dot = filename.rfind('.')
+    return filename[dot:].lower() if dot >= 0 else ''
 
 def is_supported_file(filename):
     """Check if file type is supported"""
@@ -18,7 +26,7 @@ def is_supported_file(filename):
 def sanitize_filename(filename):
     """Sanitize filename for safe storage"""
     # Remove or replace invalid characters
-    filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
+    filename = INVALID_FILENAME_CHARS_RE.sub('_', filename)
     return filename
 
 def format_date(date_obj):
@@ -35,28 +43,8 @@ def calculate_percentage(score, max_score):
 
 def get_grade(score):
     """Convert score to letter grade"""
-    if score >= 90:
-        return 'A+'
-    elif score >= 85:
-        return 'A'
-    elif score >= 80:
-        return 'A-'
-    elif score >= 75:
-        return 'B+'
-    elif score >= 70:
-        return 'B'
-    elif score >= 65:
-        return 'B-'
-    elif score >= 60:
-        return 'C+'
-    elif score >= 55:
-        return 'C'
-    elif score >= 50:
-        return 'C-'
-    elif score >= 45:
-        return 'D'
-    else:
-        return 'F'
+    from models.assessment import Assessment
+    return Assessment.get_grade(score)
 
 def parse_student_info_from_filename(filename):
     """
@@ -66,6 +54,14 @@ def parse_student_info_from_filename(filename):
     - ID_Name_Assignment.docx
     - StudentID-StudentName.pdf
     """
+    from models.student_info import StudentInfo
+    
+    # Fresh StudentInfo per call, since callers fill in missing fields in place
+    return StudentInfo(*_parse_student_info_from_filename(filename))
+
+@lru_cache(maxsize=4096)
+def _parse_student_info_from_filename(filename):
+    """Cached (student_id, student_name) parse behind parse_student_info_from_filename"""
     from config import Config
     
     # Remove extension
@@ -76,7 +72,7 @@ def parse_student_info_from_filename(filename):
     
     # Try to find student ID using patterns
     for pattern in Config.STUDENT_ID_PATTERNS:
-        match = re.search(pattern, name_part)
+        match = pattern.search(name_part)
         if match:
             student_id = match.group(0)
             break
@@ -91,13 +87,13 @@ def parse_student_info_from_filename(filename):
         
         # Split by common delimiters and take the first significant part
         # This gets the name before any dash or underscore separators
-        parts = re.split(r'[_\-]+', name_part)
+        parts = NAME_DELIMITER_RE.split(name_part)
         
         # Get the first non-empty part with actual letters
         name_words = []
         for part in parts:
             part = part.strip()
-            if part and re.search(r'[A-Za-z]{2,}', part):
+            if part and NAME_LETTERS_RE.search(part):
                 # Only take the first meaningful name segment (before dash)
                 name_words.extend(part.split())
                 break  # Stop after first meaningful segment
@@ -105,10 +101,7 @@ def parse_student_info_from_filename(filename):
         if name_words:
             student_name = ' '.join(name_words)
     
-    return {
-        'student_id': student_id,
-        'student_name': student_name.title() if student_name else None
-    }
+    return student_id, student_name.title() if student_name else None
 
 def validate_submission_data(data):
     """Validate submission data"""
@@ -121,25 +114,27 @@ def validate_submission_data(data):
     return True, "Valid"
 
 def create_submission_record(file_info, student_info):
-    """Create submission record for database"""
+    """Create submission record for database from a FileMeta and StudentInfo"""
     from dateutil import parser
     
     # Use the file's creation time from Google Drive if available
     submitted_at = datetime.utcnow()
-    if 'createdTime' in file_info and file_info['createdTime']:
+    if file_info.created_time:
         try:
-            submitted_at = parser.parse(file_info['createdTime'])
+            submitted_at = parser.parse(file_info.created_time)
         except:
             pass
     
     return {
-        'file_id': file_info.get('id'),
-        'file_name': file_info.get('name'),
-        'file_size': file_info.get('size', 0),
-        'mime_type': file_info.get('mimeType'),
-        'student_id': student_info.get('student_id'),
-        'student_name': student_info.get('student_name'),
+        'file_id': file_info.id,
+        'file_name': file_info.name,
+        'file_size': file_info.size,
+        'mime_type': file_info.mime_type,
+        'student_id': student_info.student_id,
+        'student_name': student_info.student_name,
         'submitted_at': submitted_at,
+        'modified_time': file_info.modified_time,
+        'md5_checksum': file_info.md5_checksum,
         'status': 'pending',
         'assessment': None,
         'evaluated_at': None
@@ -0,0 +1,30 @@
+"""
+orjson-backed JSON provider for Flask
+"""
+import orjson
+from bson.objectid import ObjectId
+from flask.json.provider import JSONProvider
+
+# Naive datetimes from MongoDB are UTC
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+def _default(obj):
+    """Serialize types orjson does not handle natively"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class ORJSONProvider(JSONProvider):
+    """Serialize jsonify() responses with orjson instead of the stdlib encoder"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Skip the bytes -> str -> bytes round trip of the base implementation
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+        return self._app.response_class(body, mimetype='application/json')
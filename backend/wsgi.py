@@ -0,0 +1,12 @@
+"""
+WSGI entry point for running AutoAssess under gunicorn
+"""
+# Patch the standard library before anything else imports sockets so that
+# pymongo, googleapiclient and requests all yield to other greenlets on I/O
+from gevent import monkey
+monkey.patch_all()
+
+from app import app
+
+if __name__ == '__main__':
+    app.run()
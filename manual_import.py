@@ -9,6 +9,7 @@ from backend.config import Config
 from backend.utils.db_connection import db
 from backend.services.evaluator import AssignmentEvaluator
 from backend.services.extraction import DataExtractor
+from backend.models.file_meta import FileMeta
 from backend.utils.helpers import parse_student_info_from_filename, create_submission_record
 
 # Initialize
@@ -37,11 +38,11 @@ for file_info in files:
     
     # Parse student info
     student_info = parse_student_info_from_filename(file_info['name'])
-    print(f"  Student ID: {student_info['student_id']}")
-    print(f"  Student Name: {student_info['student_name']}")
+    print(f"  Student ID: {student_info.student_id}")
+    print(f"  Student Name: {student_info.student_name}")
     
     # Create submission record
-    submission_data = create_submission_record(file_info, student_info)
+    submission_data = create_submission_record(FileMeta.from_drive(file_info), student_info)
     submission_data['file_content'] = "Sample content for testing"
     
     # Check if already exists